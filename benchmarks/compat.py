@@ -0,0 +1,72 @@
+"""
+Measure the per-call overhead of the deprecated ``public`` and ``trading``
+wrappers against the ``Public`` and ``Trading`` classes they wrap.
+
+Usage::
+
+    python benchmarks/compat.py [calls]
+
+Responses come from a :class:`bitstamp.transport.MemoryTransport`, so the
+numbers are the cost of the client alone.
+"""
+import sys
+import time
+import warnings
+
+import bitstamp.client
+from bitstamp.transport import MemoryTransport
+
+
+def make_transport():
+    transport = MemoryTransport()
+    transport.add('GET', 'ticker/btcusd/', b'{"last": "816.44"}')
+    transport.add('POST', 'balance/btcusd/', b'{"fee": "0.5000"}')
+    return transport
+
+
+def bench(call, transport, calls):
+    best = None
+    for _ in range(5):
+        del transport.calls[:]
+        start = time.time()
+        for _ in range(calls):
+            call()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / calls * 1e6
+
+
+def uncached(client, method):
+    """
+    Looks ``method`` up through ``__getattr__`` on every call, as the
+    wrappers did before caching.
+    """
+    def call():
+        vars(client).pop(method, None)
+        return getattr(client, method)()
+    return call
+
+
+def main(calls=20000):
+    transport = make_transport()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        public = bitstamp.client.public(transport=transport)
+        trading = bitstamp.client.trading('USERNAME', 'KEY', 'SECRET',
+                                          transport=transport)
+    rows = (
+        ('Public', 'ticker', public.wrapped.ticker),
+        ('public', 'ticker', public.ticker),
+        ('public', 'ticker (uncached)', uncached(public, 'ticker')),
+        ('Trading', 'account_balance', trading.wrapped.account_balance),
+        ('trading', 'account_balance', trading.account_balance),
+        ('trading', 'account_balance (uncached)',
+         uncached(trading, 'account_balance')),
+    )
+    for name, method, call in rows:
+        print('{:<8} {:<28} {:>6.1f} us/call'.format(
+            name, method, bench(call, transport, calls)))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
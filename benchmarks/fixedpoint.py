@@ -0,0 +1,112 @@
+"""
+Compare scaled integers with Decimal on order book and transaction
+workloads.
+
+parse
+    converting the price and amount strings of an order book and a trade
+    list, as returned by the API
+compute
+    on the parsed data: cumulative depth and notional of both book sides,
+    the fill price of 100 order sizes, and the VWAP of the trades
+
+Usage::
+
+    python benchmarks/fixedpoint.py [levels]
+"""
+from decimal import Decimal
+import random
+import sys
+import time
+
+from bitstamp.fixedpoint import FixedPoint
+
+PAIR = 'btcusd'
+CONVERTER = FixedPoint([{'url_symbol': PAIR, 'base_decimals': 8,
+                         'counter_decimals': 2}])
+
+
+def make_data(levels):
+    random.seed(1)
+    book = {'bids': [], 'asks': []}
+    for n in range(levels):
+        amount = '{:.8f}'.format(random.random() * 5)
+        book['bids'].append(['{:.2f}'.format(9000 - n * 0.01), amount])
+        book['asks'].append(['{:.2f}'.format(9000.01 + n * 0.01), amount])
+    trades = [{'tid': n, 'price': '{:.2f}'.format(9000 + random.random()),
+               'amount': '{:.8f}'.format(random.random())}
+              for n in range(levels)]
+    return book, trades
+
+
+def parse_decimal(book, trades):
+    parsed = dict((side, [(Decimal(p), Decimal(a)) for p, a in book[side]])
+                  for side in ('bids', 'asks'))
+    return parsed, [(Decimal(t['price']), Decimal(t['amount']))
+                    for t in trades]
+
+
+def parse_fixed_point(book, trades):
+    trades = CONVERTER.transactions(PAIR, trades)
+    return (CONVERTER.order_book(PAIR, book),
+            [(t['price'], t['amount']) for t in trades])
+
+
+def compute(book, trades, zero, sizes):
+    """
+    Works on Decimal or scaled integers alike, as long as ``sizes`` use the
+    same representation as the amounts.
+    """
+    results = []
+    for side in ('bids', 'asks'):
+        depth = notional = zero
+        cumulative = []
+        for price, amount in book[side]:
+            depth += amount
+            notional += price * amount
+            cumulative.append((depth, notional, price))
+        index = 0
+        for size in sizes:
+            while index < len(cumulative) - 1 and cumulative[index][0] < size:
+                index += 1
+            depth, notional, price = cumulative[index]
+            results.append(notional - (depth - size) * price)
+    volume = cost = zero
+    for price, amount in trades:
+        volume += amount
+        cost += price * amount
+    results.append((cost, volume))
+    return results
+
+
+def bench(func, *args):
+    best = None
+    for _ in range(5):
+        start = time.time()
+        result = func(*args)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(levels=20000):
+    book, trades = make_data(levels)
+    decimal_sizes = [Decimal(n) for n in range(1, 101)]
+    fixed_sizes = [n * 10 ** 8 for n in range(1, 101)]
+    parse_d, (book_d, trades_d) = bench(parse_decimal, book, trades)
+    parse_f, (book_f, trades_f) = bench(parse_fixed_point, book, trades)
+    compute_d, result_d = bench(compute, book_d, trades_d, Decimal(0),
+                                decimal_sizes)
+    compute_f, result_f = bench(compute, book_f, trades_f, 0, fixed_sizes)
+    # Fixed point results are scaled by 10 ** (2 + 8) and must be identical.
+    assert [Decimal(r).scaleb(-10) for r in result_f[:-1]] == result_d[:-1]
+    print('{} levels per side, {} trades'.format(levels, levels))
+    print('{:<12} {:>10} {:>10} {:>10}'.format('', 'parse', 'compute',
+                                               'total'))
+    for name, parse, work in (('decimal', parse_d, compute_d),
+                              ('fixed point', parse_f, compute_f)):
+        print('{:<12} {:>8.1f}ms {:>8.1f}ms {:>8.1f}ms'.format(
+            name, parse * 1000, work * 1000, (parse + work) * 1000))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,36 @@
+"""
+Measure how fast a recorded session is replayed through the client.
+
+Usage::
+
+    python benchmarks/replay.py session.ndjson [calls]
+
+Each recorded GET request is replayed in turn, without latency.
+"""
+import io
+import json
+import sys
+import time
+
+import bitstamp.client
+from bitstamp.replay import ReplayTransport
+
+
+def main(path, calls=10000):
+    with io.open(path, encoding='utf-8') as f:
+        urls = [json.loads(line)['url'] for line in f if line.strip()]
+    client = bitstamp.client.Public(transport=ReplayTransport(path))
+    base = client.api_url[2]
+    endpoints = [url[len(base):] for url in urls if url.startswith(base)]
+    if not endpoints:
+        sys.exit('No version 2 requests in {}'.format(path))
+    start = time.time()
+    for n in range(calls):
+        client._get(endpoints[n % len(endpoints)], version=2)
+    elapsed = time.time() - start
+    print('{:.0f} calls/s {:.1f} us/call'.format(
+        calls / elapsed, elapsed / calls * 1e6))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1], *[int(arg) for arg in sys.argv[2:3]])
@@ -0,0 +1,94 @@
+"""
+Compare the throughput of the client transports against a local stand-in
+server answering every request with a canned ticker.
+
+Usage::
+
+    python benchmarks/transports.py [calls]
+
+The stand-in server speaks plain HTTP/1.1, so the http2 transport (when httpx
+is installed) falls back to HTTP/1.1 here and only its client overhead is
+measured.
+"""
+import sys
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+import requests
+
+import bitstamp.client
+import bitstamp.transport
+
+TICKER = (b'{"high": "824.99", "last": "816.44", "timestamp": "1390425002", '
+          b'"bid": "815.09", "vwap": "814.07", "volume": "8700.01208078", '
+          b'"low": "801.00", "ask": "816.44", "open": "810.00"}')
+
+
+class TickerHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Send headers and body in one segment, avoiding delayed ACK stalls on
+    # keep-alive connections.
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(TICKER)))
+        self.end_headers()
+        self.wfile.write(TICKER)
+
+    def log_message(self, *args):
+        pass
+
+
+class ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def transports():
+    yield 'requests', bitstamp.transport.RequestsTransport()
+    yield 'requests+session', bitstamp.transport.RequestsTransport(
+        session=requests.Session())
+    yield 'urllib3', bitstamp.transport.Urllib3Transport()
+    try:
+        yield 'http2', bitstamp.transport.HTTP2Transport()
+    except ImportError:
+        print('http2: skipped, httpx is not installed')
+    memory = bitstamp.transport.MemoryTransport()
+    memory.add('GET', 'ticker/btcusd/', TICKER)
+    yield 'memory', memory
+
+
+def main(calls=2000):
+    server = ThreadingServer(('127.0.0.1', 0), TickerHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    url = 'http://127.0.0.1:{}/'.format(server.server_address[1])
+    try:
+        for name, transport in transports():
+            client = bitstamp.client.Public(transport=transport)
+            client.api_url = {1: url, 2: url}
+            client.ticker()
+            start = time.time()
+            for _ in range(calls):
+                client.ticker()
+            elapsed = time.time() - start
+            transport.close()
+            print('{:<18} {:>8.0f} calls/s {:>8.1f} us/call'.format(
+                name, calls / elapsed, elapsed / calls * 1e6))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
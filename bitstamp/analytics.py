@@ -0,0 +1,97 @@
+"""
+Order book analytics: depth, fill price and slippage of market orders.
+"""
+from bisect import bisect_left
+
+
+class BookSide(object):
+    """
+    One side of an order book snapshot with cumulative sums precomputed, so
+    fills for any number of order sizes are found by binary search instead of
+    walking the levels for each size.
+
+    ``levels`` is the list of ``[price, amount]`` pairs of ``order_book()``,
+    best price first.
+    """
+
+    def __init__(self, levels):
+        self.prices = [float(level[0]) for level in levels]
+        self.depth = []
+        self.notional = []
+        depth = notional = 0.0
+        for price, level in zip(self.prices, levels):
+            amount = float(level[1])
+            depth += amount
+            notional += price * amount
+            self.depth.append(depth)
+            self.notional.append(notional)
+
+    @property
+    def best(self):
+        return self.prices[0] if self.prices else None
+
+    def fill(self, amount):
+        """
+        Returns a dictionary describing a market order of ``amount`` taking
+        liquidity from this side::
+
+            {'amount': requested amount,
+             'filled': amount available to fill,
+             'vwap': average fill price,
+             'worst_price': price of the last level touched,
+             'slippage': relative distance from vwap to the best price,
+             'levels': number of levels consumed}
+        """
+        result = {'amount': amount, 'filled': 0.0, 'vwap': None,
+                  'worst_price': None, 'slippage': None, 'levels': 0}
+        if amount <= 0 or not self.prices:
+            return result
+        index = bisect_left(self.depth, amount)
+        if index == len(self.depth):
+            index -= 1
+            filled = self.depth[index]
+            notional = self.notional[index]
+        else:
+            before = self.depth[index - 1] if index else 0.0
+            notional_before = self.notional[index - 1] if index else 0.0
+            filled = amount
+            notional = notional_before + (amount - before) * self.prices[index]
+        vwap = notional / filled
+        result.update(filled=filled, vwap=vwap,
+                      worst_price=self.prices[index],
+                      slippage=abs(vwap - self.best) / self.best,
+                      levels=index + 1)
+        return result
+
+    def fills(self, amounts):
+        """
+        Returns the :meth:`fill` result for each of ``amounts``.
+        """
+        return [self.fill(amount) for amount in amounts]
+
+
+class MarketImpact(object):
+    """
+    Market impact calculator on an ``order_book()`` snapshot.
+
+    A buy order takes the asks and a sell order the bids.
+    """
+
+    def __init__(self, order_book):
+        self.asks = BookSide(order_book['asks'])
+        self.bids = BookSide(order_book['bids'])
+
+    def side(self, buy):
+        return self.asks if buy else self.bids
+
+    def buy(self, *amounts):
+        """
+        Returns the fill of a market buy for each of ``amounts``.
+        """
+        return self.asks.fills(amounts)
+
+    def sell(self, *amounts):
+        """
+        Returns the fill of a market sell for each of ``amounts``.
+        """
+        return self.bids.fills(amounts)
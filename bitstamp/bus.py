@@ -0,0 +1,320 @@
+"""
+Shared-memory market data bus.
+
+A single :class:`MarketDataPublisher` process polls Bitstamp and writes
+ticker, top of book and trade records into a ring buffer in a memory mapped
+file. Any number of processes on the host read it with :class:`BusReader`,
+without HTTP calls or serialization.
+
+Records are fixed-size structs. Each slot holds the sequence number of the
+record it contains, cleared while the slot is being written, so readers
+detect and skip torn records. There must be a single writer per file.
+
+A restarted writer never truncates the live file: it builds a new one with
+a new generation id, continuing the sequence numbers of the old one, and
+renames it into place. Readers switch to it once they have read the old
+file to its end.
+"""
+from collections import namedtuple
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+import requests
+
+from bitstamp.client import BitstampError
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'BSMD'
+VERSION = 2
+# Magic, version, capacity, record size, generation and head.
+HEADER = struct.Struct('<4sIIIQQ')
+RECORD = struct.Struct('<QB12sqd4d')
+SEQ = struct.Struct('<Q')
+KIND = struct.Struct('<B')
+# The header ends with the sequence number of the last record written.
+HEAD_OFFSET = HEADER.size - SEQ.size
+
+TICKER = 1
+BOOK = 2
+TRADE = 3
+
+FIELDS = {
+    TICKER: ('bid', 'ask', 'last', 'volume'),
+    BOOK: ('bid', 'bid_amount', 'ask', 'ask_amount'),
+    TRADE: ('price', 'amount', 'type', None),
+}
+
+
+def default_path(name='bitstamp-bus'):
+    """
+    Returns a path in /dev/shm when available, so the bus stays in memory.
+    """
+    directory = '/dev/shm' if os.path.isdir('/dev/shm') else \
+        tempfile.gettempdir()
+    return os.path.join(directory, name)
+
+
+def _read_header(f):
+    """
+    Returns the header fields of the open bus file ``f``, or None if it
+    isn't a bus of this version.
+    """
+    data = f.read(HEADER.size)
+    if len(data) < HEADER.size:
+        return None
+    header = HEADER.unpack(data)
+    if header[0] != MAGIC or header[1] != VERSION or \
+            header[3] != RECORD.size:
+        return None
+    return header
+
+
+def _identity(stat):
+    return stat.st_dev, stat.st_ino
+
+
+# os.replace overwrites the target on Windows too, but is Python 3 only.
+_replace = getattr(os, 'replace', os.rename)
+
+
+class Record(namedtuple('Record', 'seq kind pair id timestamp values')):
+    """
+    A bus record. ``id`` is the trade id for trades, ``values`` the four
+    numbers named in :data:`FIELDS` for the record kind.
+    """
+
+    def as_dict(self):
+        result = {'pair': self.pair, 'timestamp': self.timestamp}
+        if self.kind == TRADE:
+            result['tid'] = self.id
+        for name, value in zip(FIELDS[self.kind], self.values):
+            if name:
+                result[name] = value
+        return result
+
+
+class _Bus(object):
+
+    def _map(self, f, size):
+        self._file = f
+        self.map = mmap.mmap(f.fileno(), size)
+
+    def _head(self):
+        return SEQ.unpack_from(self.map, HEAD_OFFSET)[0]
+
+    def _offset(self, seq):
+        return HEADER.size + ((seq - 1) % self.capacity) * RECORD.size
+
+    def close(self):
+        self.map.close()
+        self._file.close()
+
+
+class BusWriter(_Bus):
+    """
+    Creates the bus file at ``path`` with room for ``capacity`` records and
+    writes records into it.
+
+    An existing bus file is replaced, not truncated, and its sequence
+    numbers are continued.
+    """
+
+    def __init__(self, path=None, capacity=4096):
+        self.path = path or default_path()
+        self.capacity = capacity
+        self.head = 0
+        try:
+            with open(self.path, 'rb') as f:
+                header = _read_header(f)
+            if header is not None:
+                self.head = header[5]
+        except (IOError, OSError):
+            pass
+        self.generation = int(time.time() * 1000000)
+        size = HEADER.size + capacity * RECORD.size
+        temporary = '{}.{}.tmp'.format(self.path, os.getpid())
+        f = open(temporary, 'w+b')
+        f.truncate(size)
+        self._map(f, size)
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, capacity, RECORD.size,
+                         self.generation, self.head)
+        _replace(temporary, self.path)
+
+    def write(self, kind, pair, values, timestamp=None, id=0):
+        """
+        Append a record and return its sequence number.
+        """
+        seq = self.head + 1
+        offset = self._offset(seq)
+        values = tuple(float(v or 0) for v in values)
+        values += (0.0,) * (4 - len(values))
+        # The slot's sequence number stays 0 until the record is complete.
+        RECORD.pack_into(self.map, offset, 0, kind,
+                         pair.encode('ascii'), int(id),
+                         float(timestamp or time.time()), *values)
+        SEQ.pack_into(self.map, offset, seq)
+        SEQ.pack_into(self.map, HEAD_OFFSET, seq)
+        self.head = seq
+        return seq
+
+
+class BusReader(_Bus):
+    """
+    Reads records from the bus file at ``path``, following it when a
+    restarted writer replaces it.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        self._attach()
+
+    def _attach(self):
+        f = open(self.path, 'r+b')
+        header = _read_header(f)
+        if header is None:
+            f.close()
+            raise ValueError("{} is not a market data bus".format(self.path))
+        self.capacity, self.generation = header[2], header[4]
+        self._identity = _identity(os.fstat(f.fileno()))
+        self._map(f, HEADER.size + self.capacity * RECORD.size)
+        self._seen = self._head()
+
+    def _current_head(self):
+        """
+        Returns the head, switching to the file of a restarted writer first
+        when nothing was written since the last call.
+        """
+        head = self._head()
+        if head == self._seen:
+            try:
+                replaced = _identity(os.stat(self.path)) != self._identity
+            except OSError:
+                replaced = False
+            if replaced:
+                self.close()
+                self._attach()
+                head = self._head()
+        self._seen = head
+        return head
+
+    def _read(self, seq):
+        """
+        Returns the record ``seq``, or None if it was overwritten or is being
+        written.
+        """
+        offset = self._offset(seq)
+        fields = RECORD.unpack_from(self.map, offset)
+        if fields[0] != seq or SEQ.unpack_from(self.map, offset)[0] != seq:
+            return None
+        return Record(seq, fields[1], fields[2].rstrip(b'\0').decode('ascii'),
+                      fields[3], fields[4], fields[5:])
+
+    def head(self):
+        """
+        Returns the sequence number of the last record written.
+        """
+        return self._current_head()
+
+    def latest(self, kind, pair):
+        """
+        Returns the newest record of ``kind`` for ``pair`` still in the ring,
+        or None.
+        """
+        head = self._current_head()
+        for seq in range(head, max(head - self.capacity, 0), -1):
+            if KIND.unpack_from(self.map, self._offset(seq) + 8)[0] != kind:
+                continue
+            record = self._read(seq)
+            if record is not None and record.kind == kind and \
+                    record.pair == pair:
+                return record
+        return None
+
+    def read_since(self, seq):
+        """
+        Returns the records written after sequence number ``seq``, oldest
+        first. Records already overwritten are skipped.
+        """
+        head = self._current_head()
+        start = max(seq, head - self.capacity) + 1
+        records = []
+        for n in range(start, head + 1):
+            record = self._read(n)
+            if record is not None:
+                records.append(record)
+        return records
+
+
+class MarketDataPublisher(object):
+    """
+    Polls a :class:`bitstamp.client.Public` client for ``pairs`` (list of
+    (base, quote) tuples) every ``interval`` seconds and writes tickers, top
+    of book and new trades to ``writer``.
+    """
+
+    def __init__(self, client, pairs, writer, interval=1.0, ticker=True,
+                 book=True, trades=True):
+        self.client = client
+        self.pairs = pairs
+        self.writer = writer
+        self.interval = interval
+        self.ticker = ticker
+        self.book = book
+        self.trades = trades
+        self.last_tid = {}
+
+    def publish(self):
+        """
+        Poll every pair once. Errors are logged and don't stop the other
+        pairs.
+        """
+        for base, quote in self.pairs:
+            pair = (base + quote).lower()
+            try:
+                self._publish_pair(pair, base, quote)
+            except (BitstampError, requests.RequestException) as e:
+                logger.error("%s: %s", pair, e)
+
+    def _publish_pair(self, pair, base, quote):
+        if self.ticker:
+            t = self.client.ticker(base=base, quote=quote)
+            self.writer.write(
+                TICKER, pair, (t['bid'], t['ask'], t['last'], t['volume']),
+                t.get('timestamp'))
+        if self.book:
+            b = self.client.order_book(base=base, quote=quote)
+            bid = b['bids'][0] if b['bids'] else (0, 0)
+            ask = b['asks'][0] if b['asks'] else (0, 0)
+            self.writer.write(BOOK, pair, (bid[0], bid[1], ask[0], ask[1]),
+                              b.get('timestamp'))
+        if self.trades:
+            self._publish_trades(pair, base, quote)
+
+    def _publish_trades(self, pair, base, quote):
+        last_tid = self.last_tid.get(pair)
+        trades = self.client.transactions(time='minute', base=base,
+                                          quote=quote)
+        new = sorted((t for t in trades
+                      if last_tid is None or int(t['tid']) > last_tid),
+                     key=lambda t: int(t['tid']))
+        for t in new:
+            self.writer.write(TRADE, pair, (t['price'], t['amount'],
+                                            t.get('type')),
+                              t['date'], t['tid'])
+        if new:
+            self.last_tid[pair] = int(new[-1]['tid'])
+
+    def run(self, stop_event=None):
+        """
+        Publish until ``stop_event`` (a :class:`threading.Event`) is set.
+        """
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            self.publish()
+            stop_event.wait(self.interval)
@@ -0,0 +1,135 @@
+"""
+Local OHLC candle aggregation from trades.
+"""
+from decimal import Decimal
+
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(5)
+
+
+class CandleAggregator(object):
+    """
+    Builds OHLC bars for several step sizes from the trades returned by
+    :meth:`bitstamp.client.Public.transactions` (or a trade stream with the
+    same dictionaries), instead of polling ``ohlc`` for every step.
+
+    Trades are deduplicated by ``tid``, so overlapping ``transactions``
+    batches can be fed as they come. Each batch is parsed once and folded
+    into the bars of every step, updating the current bar in place.
+
+    At most ``max_bars`` bars are kept per step.
+    """
+
+    def __init__(self, base="btc", quote="usd", steps=(60,), max_bars=1000):
+        self.pair = '{}/{}'.format(base.upper(), quote.upper())
+        self.steps = tuple(steps)
+        self.max_bars = max_bars
+        self.last_tid = None
+        self.bars = dict((step, {}) for step in self.steps)
+        self.seeded = dict((step, None) for step in self.steps)
+
+    def seed(self, response, step):
+        """
+        Load history for ``step`` from an :meth:`bitstamp.client.Public.ohlc`
+        response.
+
+        The newest bar is dropped, as it is usually still open: feed trades
+        covering it (e.g. the last hour of ``transactions``) to rebuild it.
+        Trades falling in the seeded bars are ignored for this step.
+        """
+        bars = self.bars[step]
+        rows = sorted(response['data']['ohlc'],
+                      key=lambda row: int(row['timestamp']))[:-1]
+        for row in rows:
+            bars[int(row['timestamp'])] = [
+                Decimal(row['open']), Decimal(row['high']),
+                Decimal(row['low']), Decimal(row['close']),
+                Decimal(row['volume'])]
+        if rows:
+            self.seeded[step] = int(rows[-1]['timestamp'])
+        self._trim(bars)
+
+    def add_trades(self, trades):
+        """
+        Fold a batch of trade dictionaries (``date``, ``tid``, ``price``,
+        ``amount``) into the bars, in any order.
+        """
+        last_tid = self.last_tid
+        parsed = []
+        for trade in trades:
+            tid = int(trade['tid'])
+            if last_tid is None or tid > last_tid:
+                parsed.append((tid, int(trade['date']),
+                               Decimal(trade['price']),
+                               Decimal(trade['amount'])))
+        if not parsed:
+            return
+        parsed.sort()
+        self.last_tid = parsed[-1][0]
+
+        for step in self.steps:
+            bars = self.bars[step]
+            seeded = self.seeded[step]
+            for tid, date, price, amount in parsed:
+                start = date - date % step
+                if seeded is not None and start <= seeded:
+                    continue
+                bar = bars.get(start)
+                if bar is None:
+                    bars[start] = [price, price, price, price, amount]
+                    continue
+                if price > bar[HIGH]:
+                    bar[HIGH] = price
+                elif price < bar[LOW]:
+                    bar[LOW] = price
+                bar[CLOSE] = price
+                bar[VOLUME] += amount
+            self._trim(bars)
+
+    def add_trade(self, trade):
+        """
+        Fold a single streamed trade into the bars.
+        """
+        self.add_trades([trade])
+
+    def _trim(self, bars):
+        if len(bars) > self.max_bars:
+            for start in sorted(bars)[:len(bars) - self.max_bars]:
+                del bars[start]
+
+    def current(self, step):
+        """
+        Returns the newest bar of ``step`` as an ohlc row, or None.
+        """
+        bars = self.bars[step]
+        if not bars:
+            return None
+        start = max(bars)
+        return self._row(start, bars[start])
+
+    @staticmethod
+    def _row(start, bar):
+        return {'timestamp': str(start),
+                'open': str(bar[OPEN]),
+                'high': str(bar[HIGH]),
+                'low': str(bar[LOW]),
+                'close': str(bar[CLOSE]),
+                'volume': str(bar[VOLUME])}
+
+    def ohlc(self, step=60, start=None, end=None, limit=1000):
+        """
+        Returns the bars of ``step`` in the same shape as
+        :meth:`bitstamp.client.Public.ohlc`::
+
+            {'data': {'pair': 'BTC/USD',
+                      'ohlc': [{'timestamp': '1390425000', 'open': ...,
+                                'high': ..., 'low': ..., 'close': ...,
+                                'volume': ...}, ...]}}
+        """
+        bars = self.bars[step]
+        starts = sorted(bars)
+        if start is not None:
+            starts = [s for s in starts if s >= start]
+        if end is not None:
+            starts = [s for s in starts if s <= end]
+        rows = [self._row(s, bars[s]) for s in starts[-limit:]]
+        return {'data': {'pair': self.pair, 'ohlc': rows}}
@@ -0,0 +1,199 @@
+"""
+Long-lived market data streamer, installed as the ``bitstamp-stream``
+command.
+
+Polls ticker, trades or order book of several pairs over a single reused
+connection and writes one record per line of NDJSON to stdout::
+
+    bitstamp-stream ticker --pairs btcusd,ethusd --fields last,bid,ask
+    bitstamp-stream trades --pairs btcusd --interval 5 | jq .price
+    bitstamp-stream book --pairs btcusd --count 10
+
+Trades are only written once, oldest first. The order book is written as
+level deltas (see :mod:`bitstamp.orderbook`), the first poll adding every
+level.
+
+``--format binary`` writes fixed little-endian records instead: a
+``<BB8sqd`` header (kind 1 ticker / 2 trade / 3 book, number of values,
+pair, id, timestamp) followed by that many doubles. The id is the trade id
+for trades; book values are side (0 bids, 1 asks), action (0 add, 1
+change, 2 remove), price and amount.
+"""
+import argparse
+import json
+import logging
+import struct
+import sys
+import time
+
+import requests
+
+import bitstamp.client
+from bitstamp.orderbook import ADD, CHANGE, OrderBookDiffer
+from bitstamp.transport import RequestsTransport, get_transport
+
+logger = logging.getLogger(__name__)
+
+TICKER, TRADE, BOOK = 1, 2, 3
+KINDS = {'ticker': TICKER, 'trades': TRADE, 'book': BOOK}
+HEADER = struct.Struct('<BB8sqd')
+ACTIONS = {ADD: 0, CHANGE: 1}
+DEFAULT_FIELDS = {
+    'ticker': ('last', 'bid', 'ask', 'volume'),
+    'trades': ('price', 'amount', 'type'),
+}
+
+
+def split_pair(pair):
+    """
+    Returns (base, quote) of 'btcusd', 'btc/usd' or 'BTC-USD'.
+    """
+    pair = pair.lower()
+    for separator in ('/', '-', '_'):
+        if separator in pair:
+            return tuple(pair.split(separator, 1))
+    return pair[:3], pair[3:]
+
+
+class Streamer(object):
+    """
+    Polls ``client`` for the ``kind`` of data ('ticker', 'trades' or 'book')
+    of ``pairs`` and writes records to the binary stream ``out``.
+    """
+
+    def __init__(self, client, kind, pairs, out, fields=None,
+                 binary=False):
+        self.client = client
+        self.kind = kind
+        self.pairs = [split_pair(pair) for pair in pairs]
+        self.out = out
+        self.fields = tuple(fields or DEFAULT_FIELDS.get(kind, ()))
+        self.binary = binary
+        self.last_tid = {}
+        self.books = {}
+
+    def _write(self, pair, record, id=0, timestamp=0, values=()):
+        if self.binary:
+            values = [float(v or 0) for v in values]
+            self.out.write(HEADER.pack(KINDS[self.kind], len(values),
+                                       pair.encode('ascii'), int(id),
+                                       float(timestamp or 0)))
+            self.out.write(struct.pack('<{}d'.format(len(values)), *values))
+        else:
+            record['pair'] = pair
+            self.out.write(json.dumps(record, separators=(',', ':'))
+                           .encode('utf-8') + b'\n')
+
+    def _select(self, data):
+        return dict((field, data.get(field)) for field in self.fields)
+
+    def poll_ticker(self, base, quote, pair):
+        ticker = self.client.ticker(base=base, quote=quote)
+        record = self._select(ticker)
+        record['timestamp'] = ticker.get('timestamp')
+        self._write(pair, record, 0, ticker.get('timestamp'),
+                    [ticker.get(field) for field in self.fields])
+
+    def poll_trades(self, base, quote, pair):
+        last_tid = self.last_tid.get(pair)
+        trades = self.client.transactions(
+            time=bitstamp.client.TransRange.MINUTE, base=base, quote=quote)
+        trades = sorted((t for t in trades
+                         if last_tid is None or int(t['tid']) > last_tid),
+                        key=lambda t: int(t['tid']))
+        for trade in trades:
+            record = self._select(trade)
+            record['tid'] = int(trade['tid'])
+            record['date'] = trade['date']
+            self._write(pair, record, trade['tid'], trade['date'],
+                        [trade.get(field) for field in self.fields])
+        if trades:
+            self.last_tid[pair] = int(trades[-1]['tid'])
+
+    def poll_book(self, base, quote, pair):
+        book = self.client.order_book(base=base, quote=quote)
+        differ = self.books.setdefault(pair, OrderBookDiffer())
+        for side, action, price, amount in differ.update(book):
+            record = {'side': side, 'action': action, 'price': price,
+                      'amount': amount}
+            self._write(pair, record, 0, book.get('timestamp'),
+                        [side == 'asks', ACTIONS.get(action, 2),
+                         price, amount])
+
+    def poll(self):
+        """
+        Poll every pair once and flush the output.
+        """
+        poll = getattr(self, 'poll_' + self.kind)
+        for base, quote in self.pairs:
+            # Every transport raises its connection errors as requests
+            # exceptions, and timeouts as BitstampTimeout.
+            try:
+                poll(base, quote, base + quote)
+            except (bitstamp.client.BitstampError,
+                    requests.RequestException) as e:
+                logger.error("%s%s: %s", base, quote, e)
+        self.out.flush()
+
+    def run(self, interval, count=0):
+        """
+        Poll every ``interval`` seconds, ``count`` times or forever.
+        """
+        polls = 0
+        while not count or polls < count:
+            started = time.time()
+            self.poll()
+            polls += 1
+            if not count or polls < count:
+                time.sleep(max(interval - (time.time() - started), 0))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='bitstamp-stream',
+        description="Stream Bitstamp market data to stdout as NDJSON.")
+    parser.add_argument('kind', choices=sorted(KINDS))
+    parser.add_argument('--pairs', default='btcusd',
+                        help="comma separated pairs (default: btcusd)")
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help="seconds between polls (default: 1)")
+    parser.add_argument('--count', type=int, default=0,
+                        help="number of polls, 0 for no limit")
+    parser.add_argument('--fields',
+                        help="comma separated ticker or trade fields")
+    parser.add_argument('--format', choices=('ndjson', 'binary'),
+                        default='ndjson')
+    parser.add_argument('--transport', choices=('requests', 'urllib3'),
+                        default='requests')
+    parser.add_argument('--timeout', type=float, default=10.0,
+                        help="seconds per request (default: 10)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+    if args.transport == 'requests':
+        transport = RequestsTransport(session=requests.Session())
+    else:
+        transport = get_transport(args.transport)
+    client = bitstamp.client.Public(transport=transport,
+                                    timeout=args.timeout)
+    out = getattr(sys.stdout, 'buffer', sys.stdout)
+    streamer = Streamer(client, args.kind, args.pairs.split(','), out,
+                        fields=args.fields and args.fields.split(','),
+                        binary=args.format == 'binary')
+    try:
+        streamer.run(args.interval, args.count)
+    except KeyboardInterrupt:
+        pass
+    except IOError:
+        # Reader went away, e.g. piped into head.
+        pass
+    finally:
+        transport.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,18 +1,60 @@
+from contextlib import contextmanager
 from functools import wraps
 import hmac
+import numbers
 import hashlib
+import threading
 import time
+from timeit import default_timer
 import warnings
 import logging
 
 import requests
 
+from bitstamp.analytics import MarketImpact
+from bitstamp.clock import DEFAULT_CLOCK, parse_http_date
+from bitstamp.deadline import Deadline
+from bitstamp.fixedpoint import FixedPoint
+from bitstamp.tracing import RequestTrace
+from bitstamp.transport import get_transport
+
 logger = logging.getLogger(__name__)
 
 class BitstampError(Exception):
     pass
 
 
+class BitstampTimeout(BitstampError):
+    """
+    Raised when a call did not complete before its deadline.
+    """
+
+
+class SlippageError(BitstampError):
+    """
+    Raised when a market order would slip more than allowed.
+    """
+
+
+def _is_int(value):
+    return isinstance(value, numbers.Integral) and not isinstance(value, bool)
+
+
+def _within_timeout(method):
+    """
+    Decorator bounding all the requests made by a client ``method`` by the
+    client ``timeout``, for methods making more than one request.
+    """
+    @wraps(method)
+    def bounded(self, *args, **kwargs):
+        if self.timeout is None or \
+                getattr(self._local, 'deadline', None) is not None:
+            return method(self, *args, **kwargs)
+        with self.deadline(self.timeout):
+            return method(self, *args, **kwargs)
+    return bounded
+
+
 class TransRange(object):
     """
     Enum like object used in transaction method to specify time range
@@ -26,29 +68,155 @@ class TransRange(object):
 class BaseClient(object):
     """
     A base class for the API Client methods that handles interaction with
+    the HTTP transport.
+
+    ``transport`` is a :class:`bitstamp.transport.Transport` instance or the
+    name of one ('requests', 'urllib3', 'http2' or 'memory'), defaulting to
     the requests library.
+
+    ``clock`` is the :class:`bitstamp.clock.ClockEstimator` fed by every
+    response. Clients created without one share
+    :data:`bitstamp.clock.DEFAULT_CLOCK`.
+
+    Callables registered with :meth:`add_trace_hook` receive a
+    :class:`bitstamp.tracing.RequestTrace` after every request.
+
+    ``timeout`` is the number of seconds each call may take in total,
+    including every request it makes (e.g. the order book fetched by
+    ``max_slippage``), unless it runs inside a :meth:`deadline`.
+
+    With ``fixed_point`` set, prices and amounts of tickers, order books and
+    trades are returned as integers scaled by the decimals of the pair (see
+    :mod:`bitstamp.fixedpoint`), and integer order arguments are read the
+    same way.
     """
     api_url = {1: 'https://www.bitstamp.net/api/',
                2: 'https://www.bitstamp.net/api/v2/'}
     exception_on_error = True
 
-    def __init__(self, proxydict=None, *args, **kwargs):
+    def __init__(self, proxydict=None, transport=None, clock=None,
+                 timeout=None, fixed_point=False, *args, **kwargs):
         self.proxydict = proxydict
+        self.fixed_point = fixed_point
+        self._fixed_point_converter = None
+        self.transport = get_transport(transport)
+        self.clock = clock or DEFAULT_CLOCK
+        self.timeout = timeout
+        self.trace_hooks = []
+        self._local = threading.local()
+
+    @contextmanager
+    def deadline(self, seconds):
+        """
+        Context manager bounding every call made by the current thread in the
+        block to complete within ``seconds`` in total::
+
+            with client.deadline(2.5):
+                client.buy_limit_order(amount, price)
+
+        Requests made inside the block, or under the client ``timeout``, run
+        on a worker thread and :class:`BitstampTimeout` is raised as soon as
+        the deadline passes, however slowly the response arrives, or when a
+        request would start after it. An abandoned request may still reach
+        Bitstamp: an order can be placed even though the call timed out.
+        Connect and read timeouts of each request are set to the time left,
+        which bounds how long an abandoned worker lingers on each socket
+        read.
+
+        Nested deadlines can only shorten the enclosing one. The
+        :class:`bitstamp.deadline.Deadline` is yielded, for waits made inside
+        the block.
+        """
+        outer = getattr(self._local, 'deadline', None)
+        deadline = Deadline(seconds)
+        if outer is not None and outer.expires < deadline.expires:
+            deadline = outer
+        self._local.deadline = deadline
+        try:
+            yield deadline
+        finally:
+            self._local.deadline = outer
+
+    def _request_within(self, deadline, endpoint, method, url, *args,
+                        **kwargs):
+        """
+        Send the request through the transport on a worker thread, raising
+        :class:`BitstampTimeout` if it didn't complete before ``deadline``.
+        """
+        result = {}
+        done = threading.Event()
+
+        def send():
+            try:
+                result['response'] = self.transport.request(
+                    method, url, *args, **kwargs)
+            except Exception as e:
+                result['error'] = e
+            finally:
+                done.set()
+
+        worker = threading.Thread(target=send, name='bitstamp-request')
+        worker.daemon = True
+        worker.start()
+        if not done.wait(deadline.remaining()):
+            raise BitstampTimeout(
+                "Deadline passed while requesting {}".format(endpoint))
+        if 'error' in result:
+            raise result['error']
+        return result['response']
+
+    def _request_timeout(self, endpoint):
+        """
+        Returns the timeout of the next request in seconds, or None.
+        """
+        deadline = getattr(self._local, 'deadline', None)
+        if deadline is None:
+            return self.timeout
+        remaining = deadline.remaining()
+        if remaining <= 0:
+            raise BitstampTimeout(
+                "Deadline passed before requesting {}".format(endpoint))
+        if self.timeout is not None:
+            return min(remaining, self.timeout)
+        return remaining
+
+    def add_trace_hook(self, hook):
+        """
+        Register ``hook`` to be called with the
+        :class:`bitstamp.tracing.RequestTrace` of each request, failed ones
+        included.
+        """
+        self.trace_hooks.append(hook)
+
+    def remove_trace_hook(self, hook):
+        self.trace_hooks.remove(hook)
+
+    def server_time(self):
+        """
+        Returns the estimated current Bitstamp server time as a unix
+        timestamp.
+        """
+        return self.clock.time()
 
     def _get(self, *args, **kwargs):
         """
         Make a GET request.
         """
-        return self._request(requests.get, *args, **kwargs)
+        return self._request('GET', *args, **kwargs)
 
     def _post(self, *args, **kwargs):
         """
         Make a POST request.
         """
-        data = self._default_data()
+        if self.trace_hooks:
+            trace = kwargs['trace'] = RequestTrace('POST', args[0])
+            with trace.phase('sign'):
+                data = self._default_data()
+        else:
+            data = self._default_data()
         data.update(kwargs.get('data') or {})
         kwargs['data'] = data
-        return self._request(requests.post, *args, **kwargs)
+        return self._request('POST', *args, **kwargs)
 
     def _default_data(self):
         """
@@ -66,33 +234,127 @@ class BaseClient(object):
             url = url + base.lower() + quote.lower() + "/"
             return url
 
-    def _request(self, func, url, version=1, *args, **kwargs):
+    def _observe_clock(self, endpoint, sent, received, response,
+                       json_response):
+        """
+        Feed the round trip and any server timestamps to the clock estimator.
         """
-        Make a generic request, adding in any proxy defined by the instance.
+        server_time = parse_http_date(response.headers.get('Date'))
+        self.clock.observe(endpoint, sent, received, server_time)
+        timestamp = None
+        if isinstance(json_response, dict):
+            timestamp = json_response.get('timestamp')
+        elif json_response and isinstance(json_response, list) and \
+                isinstance(json_response[0], dict):
+            timestamp = json_response[0].get('date')
+        try:
+            if timestamp is not None:
+                self.clock.observe_lower_bound(int(timestamp), received)
+        except (TypeError, ValueError):
+            pass
+
+    def _request(self, method, url, version=1, *args, **kwargs):
+        """
+        Make a generic request through the transport, adding in any proxy
+        defined by the instance.
 
         Raises a ``requests.HTTPError`` if the response status isn't 200, and
         raises a :class:`BitstampError` if the response contains a json encoded
-        error message.
+        error message. Connection failures raise ``requests.ConnectionError``
+        whatever the transport, and expired timeouts :class:`BitstampTimeout`.
+        """
+        trace = kwargs.pop('trace', None)
+        if trace is None and self.trace_hooks:
+            trace = RequestTrace(method, url)
+        if trace is None:
+            return self._send(method, url, version, None, *args, **kwargs)
+        try:
+            return self._send(method, url, version, trace, *args, **kwargs)
+        except Exception as e:
+            trace.error = e
+            raise
+        finally:
+            trace.finish()
+            for hook in self.trace_hooks:
+                # A failing hook must not hide the outcome of the request,
+                # e.g. an order that was placed.
+                try:
+                    hook(trace)
+                except Exception:
+                    logger.exception("Trace hook %r failed", hook)
+
+    @staticmethod
+    def _decode_json(response, trace=None):
+        """
+        Returns the decoded json body of the response, or None.
+        """
+        start = default_timer()
+        try:
+            return response.json()
+        except ValueError:
+            return None
+        finally:
+            if trace is not None:
+                trace.add('decode', default_timer() - start)
+
+    def _send(self, method, url, version, trace, *args, **kwargs):
+        """
+        Send the request and check the response, see :meth:`_request`.
         """
         return_json = kwargs.pop('return_json', False)
+        endpoint = url
         url = self.api_url[version] + url
         logger.debug("Request URL: " + url)
         if 'data' in kwargs and 'nonce' in kwargs['data']:
             logger.debug("Request nonce: " + str(kwargs['data']['nonce']))
-        response = func(url, *args, **kwargs)
+        if 'proxies' not in kwargs:
+            kwargs['proxies'] = self.proxydict
+        timeout = self._request_timeout(endpoint)
+        if timeout is not None:
+            kwargs['timeout'] = timeout
+        deadline = getattr(self._local, 'deadline', None)
+        if deadline is None and self.timeout is not None:
+            deadline = Deadline(self.timeout)
+        if trace is not None:
+            trace.url = url
+            trace.nonce = (kwargs.get('data') or {}).get('nonce')
+        sent = time.time()
+        try:
+            if deadline is None:
+                response = self.transport.request(method, url, *args,
+                                                  **kwargs)
+            else:
+                response = self._request_within(deadline, endpoint, method,
+                                                url, *args, **kwargs)
+        except self.transport.timeout_exceptions as e:
+            if trace is not None:
+                trace.add('wait', time.time() - sent)
+            raise BitstampTimeout(
+                "Request to {} timed out after {:.3f}s: {}".format(
+                    endpoint, time.time() - sent, e))
+        except Exception:
+            # Failed requests are the slowest ones, keep their time.
+            if trace is not None:
+                trace.add('wait', time.time() - sent)
+            raise
+        received = time.time()
         logger.debug("Response Code {} and Reason {}".format(response.status_code, response.reason))
         logger.debug("Response Text {}".format(response.text))
 
-        if 'proxies' not in kwargs:
-            kwargs['proxies'] = self.proxydict
+        if trace is not None:
+            trace.status_code = response.status_code
+            total = received - sent
+            wait = response.elapsed.total_seconds() if response.elapsed \
+                else 0.0
+            wait = min(wait, total) if wait else total
+            trace.add('wait', wait)
+            trace.add('download', total - wait)
 
         # Check for error, raising an exception if appropriate.
         response.raise_for_status()
 
-        try:
-            json_response = response.json()
-        except ValueError:
-            json_response = None
+        json_response = self._decode_json(response, trace)
+        self._observe_clock(endpoint, sent, received, response, json_response)
         if isinstance(json_response, dict):
             error = json_response.get('error')
             if error:
@@ -111,20 +373,50 @@ class BaseClient(object):
 
 class Public(BaseClient):
 
+    def fixed_point_converter(self):
+        """
+        Returns the :class:`bitstamp.fixedpoint.FixedPoint` converter of the
+        client, fetching ``trading_pairs_info`` on first use.
+        """
+        if self._fixed_point_converter is None:
+            self._fixed_point_converter = FixedPoint(self.trading_pairs_info())
+        return self._fixed_point_converter
+
+    def _convert(self, kind, base, quote, result):
+        """
+        Scale the prices and amounts of ``result`` in fixed point mode.
+        """
+        if not self.fixed_point or not base or not quote:
+            return result
+        converter = self.fixed_point_converter()
+        return getattr(converter, kind)(base.lower() + quote.lower(), result)
+
+    @_within_timeout
     def ticker(self, base="btc", quote="usd"):
         """
         Returns dictionary.
         """
         url = self._construct_url("ticker/", base, quote)
-        return self._get(url, return_json=True, version=2)
+        result = self._get(url, return_json=True, version=2)
+        return self._convert('ticker', base, quote, result)
 
+    def all_tickers(self):
+        """
+        Returns list of ticker dictionaries of all currency pairs, each with
+        a 'pair' key such as 'BTC/USD'.
+        """
+        return self._get("ticker/", return_json=True, version=2)
+
+    @_within_timeout
     def ticker_hour(self, base="btc", quote="usd"):
         """
         Returns dictionary of the average ticker of the past hour.
         """
         url = self._construct_url("ticker_hour/", base, quote)
-        return self._get(url, return_json=True, version=2)
+        result = self._get(url, return_json=True, version=2)
+        return self._convert('ticker', base, quote, result)
 
+    @_within_timeout
     def order_book(self, group=True, base="btc", quote="usd"):
         """
         Returns dictionary with "bids" and "asks".
@@ -134,7 +426,8 @@ class Public(BaseClient):
         """
         params = {'group': group}
         url = self._construct_url("order_book/", base, quote)
-        return self._get(url, params=params, return_json=True, version=2)
+        result = self._get(url, params=params, return_json=True, version=2)
+        return self._convert('order_book', base, quote, result)
 
     def ohlc(self, base="btc", quote="usd", start=None, end=None, step=60, limit=1000):
         """
@@ -151,6 +444,7 @@ class Public(BaseClient):
         url = self._construct_url("ohlc/", base, quote)
         return self._get(url, params=params, return_json=True, version=2)
 
+    @_within_timeout
     def transactions(self, time=TransRange.HOUR, base="btc", quote="usd"):
         """
         Returns transactions for the last 'timedelta' seconds.
@@ -158,7 +452,8 @@ class Public(BaseClient):
         """
         params = {'time': time}
         url = self._construct_url("transactions/", base, quote)
-        return self._get(url, params=params, return_json=True, version=2)
+        result = self._get(url, params=params, return_json=True, version=2)
+        return self._convert('transactions', base, quote, result)
 
     def conversion_rate_usd_eur(self):
         """
@@ -201,9 +496,16 @@ class Trading(Public):
         """
         Get a unique nonce for the bitstamp API.
 
-        This integer must always be increasing, so use the current unix time.
-        Every time this variable is requested, it automatically increments to
-        allow for more than one API request per second.
+        This integer must always be increasing, so use the current unix time,
+        or the server time estimated by :attr:`clock` when it is ahead. Every
+        time this variable is requested, it automatically increments to allow
+        for more than one API request per second.
+
+        Clients using the same key must share their :attr:`clock` (as they
+        do by default within a process), or the calibrated ones issue higher
+        nonces than the others. The offset is not persisted: after a restart
+        on a host running behind the server, nonces follow local time until
+        the clock is calibrated again.
 
         This isn't a thread-safe function however, so you should only rely on a
         single thread if you have a high level of concurrent API requests in
@@ -214,7 +516,7 @@ class Trading(Public):
             nonce += 1
         # If the unix time is greater though, use that instead (helps low
         # concurrency multi-threaded apps always call with the largest nonce).
-        self._nonce = max(int(time.time()), nonce)
+        self._nonce = max(int(time.time()), int(self.clock.time()), nonce)
         return self._nonce
 
     def _default_data(self, *args, **kwargs):
@@ -269,7 +571,7 @@ class Trading(Public):
         return self._post(url, return_json=True, version=2)
 
     def user_transactions(self, offset=0, limit=100, descending=True,
-                          base=None, quote=None):
+                          base=None, quote=None, since_id=None):
         """
         Returns descending list of transactions. Every transaction (dictionary)
         contains::
@@ -282,12 +584,17 @@ class Trading(Public):
              u'id': 213642}
 
         Instead of the keys btc and usd, it can contain other currency codes
+
+        If since_id is given, only transactions from that id on are returned
+        and Bitstamp sets limit to 1000.
         """
         data = {
             'offset': offset,
             'limit': limit,
             'sort': 'desc' if descending else 'asc',
         }
+        if since_id is not None:
+            data['since_id'] = since_id
         url = self._construct_url("user_transactions/", base, quote)
         return self._post(url, data=data, return_json=True, version=2)
 
@@ -347,43 +654,101 @@ class Trading(Public):
         """
         return self._post("cancel_all_orders/", return_json=True, version=1)
 
-    def buy_limit_order(self, amount, price, base="btc", quote="usd", limit_price=None, ioc_order=False):
+    def _order_data(self, base, quote, amount, price=None, limit_price=None):
         """
-        Order to buy amount of bitcoins for specified price.
+        Order data, with scaled integer arguments formatted as decimal strings
+        in fixed point mode.
         """
-        data = {'amount': amount, 'price': price}
+        if self.fixed_point:
+            converter = self.fixed_point_converter()
+            pair = base.lower() + quote.lower()
+            if _is_int(amount):
+                amount = converter.format_amount(pair, amount)
+            if _is_int(price):
+                price = converter.format_price(pair, price)
+            if _is_int(limit_price):
+                limit_price = converter.format_price(pair, limit_price)
+        data = {'amount': amount}
+        if price is not None:
+            data['price'] = price
         if limit_price is not None:
             data['limit_price'] = limit_price
+        return data
+
+    @_within_timeout
+    def buy_limit_order(self, amount, price, base="btc", quote="usd", limit_price=None, ioc_order=False):
+        """
+        Order to buy amount of bitcoins for specified price.
+        """
+        data = self._order_data(base, quote, amount, price, limit_price)
         if ioc_order is True:
             data['ioc_order'] = True
         url = self._construct_url("buy/", base, quote)
         return self._post(url, data=data, return_json=True, version=2)
 
-    def buy_market_order(self, amount, base="btc", quote="usd"):
+    def _check_slippage(self, amount, buy, base, quote, max_slippage):
+        """
+        Raise a :class:`SlippageError` if a market order of ``amount`` would
+        slip more than ``max_slippage`` on the current order book.
+        """
+        size = amount
+        if self.fixed_point and not _is_int(amount):
+            # The order book amounts are scaled integers in this mode.
+            size = self.fixed_point_converter().amount(
+                base.lower() + quote.lower(), amount)
+        if float(size) <= 0:
+            raise ValueError("Order amount must be positive: {}".format(
+                amount))
+        book = self.order_book(base=base, quote=quote)
+        fill = MarketImpact(book).side(buy).fill(float(size))
+        if fill['filled'] < float(size):
+            raise SlippageError(
+                "Order book too thin to fill {}".format(amount))
+        if fill['slippage'] > max_slippage:
+            raise SlippageError(
+                "Estimated slippage {:.4%} above limit {:.4%}".format(
+                    fill['slippage'], max_slippage))
+
+    @_within_timeout
+    def buy_market_order(self, amount, base="btc", quote="usd",
+                         max_slippage=None):
         """
         Order to buy amount of bitcoins for market price.
+
+        If ``max_slippage`` is given, the order book is fetched first and a
+        :class:`SlippageError` is raised instead of placing the order when
+        the estimated fill price is more than ``max_slippage`` (a fraction,
+        e.g. 0.005) away from the best price, or the book is too thin.
         """
-        data = {'amount': amount}
+        if max_slippage is not None:
+            self._check_slippage(amount, True, base, quote, max_slippage)
+        data = self._order_data(base, quote, amount)
         url = self._construct_url("buy/market/", base, quote)
         return self._post(url, data=data, return_json=True, version=2)
 
+    @_within_timeout
     def sell_limit_order(self, amount, price, base="btc", quote="usd", limit_price=None, ioc_order=False):
         """
         Order to sell amount of bitcoins for specified price.
         """
-        data = {'amount': amount, 'price': price}
-        if limit_price is not None:
-            data['limit_price'] = limit_price
+        data = self._order_data(base, quote, amount, price, limit_price)
         if ioc_order is True:
             data['ioc_order'] = True
         url = self._construct_url("sell/", base, quote)
         return self._post(url, data=data, return_json=True, version=2)
 
-    def sell_market_order(self, amount, base="btc", quote="usd"):
+    @_within_timeout
+    def sell_market_order(self, amount, base="btc", quote="usd",
+                          max_slippage=None):
         """
         Order to sell amount of bitcoins for market price.
+
+        ``max_slippage`` works as in :meth:`buy_market_order`, against the
+        bids.
         """
-        data = {'amount': amount}
+        if max_slippage is not None:
+            self._check_slippage(amount, False, base, quote, max_slippage)
+        data = self._order_data(base, quote, amount)
         url = self._construct_url("sell/market/", base, quote)
         return self._post(url, data=data, return_json=True, version=2)
 
@@ -581,6 +946,9 @@ class BackwardsCompat(object):
         """
         Return the wrapped attribute. If it's a callable then return the error
         tuple when appropriate.
+
+        Callables are wrapped once and cached on the instance, so later calls
+        don't go through ``__getattr__`` again.
         """
         attr = getattr(self.wrapped, name)
         if not callable(attr):
@@ -596,8 +964,25 @@ class BackwardsCompat(object):
             except BitstampError as e:
                 return False, e.args[0]
 
+        self.__dict__[name] = wrapped_callable
         return wrapped_callable
 
+    def __setattr__(self, name, value):
+        """
+        Set attributes on the wrapped client, dropping any cached wrapper.
+        """
+        if name == 'wrapped':
+            # The cached wrappers call the previous client.
+            self.__dict__.clear()
+            object.__setattr__(self, name, value)
+            return
+        self.__dict__.pop(name, None)
+        setattr(self.wrapped, name, value)
+
+    def __delattr__(self, name):
+        self.__dict__.pop(name, None)
+        delattr(self.wrapped, name)
+
 
 class public(BackwardsCompat):
     """
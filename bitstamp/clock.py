@@ -0,0 +1,92 @@
+"""
+Estimation of the Bitstamp server clock offset and of round-trip times.
+"""
+from email.utils import mktime_tz, parsedate_tz
+import time
+
+
+def parse_http_date(value):
+    """
+    Returns the unix time of an HTTP ``Date`` header, or None.
+    """
+    if not value:
+        return None
+    parsed = parsedate_tz(value)
+    if parsed is None:
+        return None
+    return mktime_tz(parsed)
+
+
+class ClockEstimator(object):
+    """
+    Keeps a smoothed estimate of the server clock offset (server time minus
+    local time, in seconds) and of the round-trip time of each endpoint.
+
+    Offset samples come from the ``Date`` header, assuming the server stamped
+    it halfway through the round trip. Timestamps found in response bodies
+    (ticker, order book, trades) were created before the response was sent,
+    so they only raise a lower bound on the offset.
+
+    Smoothing follows the TCP round-trip estimator: ``alpha`` weighs new
+    samples and ``beta`` the RTT variation.
+    """
+
+    def __init__(self, alpha=0.125, beta=0.25):
+        self.alpha = alpha
+        self.beta = beta
+        self.offset = 0.0
+        self.samples = 0
+        self.srtt = {}
+        self.rttvar = {}
+
+    def observe(self, endpoint, sent, received, server_time=None,
+                resolution=1.0):
+        """
+        Record a request to ``endpoint`` sent and received at the given local
+        times. ``server_time`` is the server's time truncated to
+        ``resolution`` seconds, if known.
+        """
+        rtt = received - sent
+        srtt = self.srtt.get(endpoint)
+        if srtt is None:
+            self.srtt[endpoint] = rtt
+            self.rttvar[endpoint] = rtt / 2
+        else:
+            self.rttvar[endpoint] += self.beta * (
+                abs(srtt - rtt) - self.rttvar[endpoint])
+            self.srtt[endpoint] = srtt + self.alpha * (rtt - srtt)
+
+        if server_time is not None:
+            sample = server_time + resolution / 2.0 - (sent + received) / 2.0
+            if self.samples:
+                self.offset += self.alpha * (sample - self.offset)
+            else:
+                self.offset = sample
+            self.samples += 1
+
+    def observe_lower_bound(self, server_time, received):
+        """
+        Record a server timestamp known to predate the local time
+        ``received``.
+        """
+        bound = server_time - received
+        if bound > self.offset:
+            self.offset = bound
+
+    def rtt(self, endpoint):
+        """
+        Returns the smoothed round-trip time of ``endpoint`` in seconds, or
+        None if it was never called.
+        """
+        return self.srtt.get(endpoint)
+
+    def time(self):
+        """
+        Returns the current server time estimate as a unix timestamp.
+        """
+        return time.time() + self.offset
+
+
+# Estimator of the clients created without one, so that all clients of a
+# process share the same calibration.
+DEFAULT_CLOCK = ClockEstimator()
@@ -0,0 +1,42 @@
+"""
+Deadlines bounding the time spent in API calls.
+"""
+import time
+from timeit import default_timer
+
+
+class Deadline(object):
+    """
+    An absolute point in time, ``seconds`` from now, by which a call or a
+    group of calls must complete.
+
+    ``expires`` is measured on :func:`timeit.default_timer`, which does not
+    jump with the wall clock on Python 3.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires = default_timer() + seconds
+
+    def remaining(self):
+        """
+        Returns the number of seconds left, never below 0.
+        """
+        return max(self.expires - default_timer(), 0.0)
+
+    @property
+    def expired(self):
+        return default_timer() >= self.expires
+
+    def sleep(self, seconds):
+        """
+        Sleep ``seconds``, or return False without sleeping if the deadline
+        would pass before, for waits between retries or rate limited calls.
+        """
+        if seconds > self.remaining():
+            return False
+        time.sleep(seconds)
+        return True
+
+    def __repr__(self):
+        return '<Deadline {:.3f}s left>'.format(self.remaining())
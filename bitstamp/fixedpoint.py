@@ -0,0 +1,143 @@
+"""
+Fixed-point integer representation of prices and amounts.
+
+Prices are scaled by ``10 ** counter_decimals`` and amounts by
+``10 ** base_decimals`` of their pair, as listed by ``trading_pairs_info``,
+so '816.44' on btcusd becomes 81644. Integers keep arithmetic exact at a
+fraction of the cost of :class:`decimal.Decimal`.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+PRICE_FIELDS = ('last', 'high', 'low', 'vwap', 'bid', 'ask', 'open')
+
+
+def to_scaled(value, decimals):
+    """
+    Returns the string (or number) ``value`` as an integer scaled by
+    ``10 ** decimals``, rounding half away from zero.
+    """
+    text = str(value)
+    if 'e' in text or 'E' in text:
+        scaled = Decimal(text).scaleb(decimals)
+        return int(scaled.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    negative = text.startswith('-')
+    if negative or text.startswith('+'):
+        text = text[1:]
+    whole, _, fraction = text.partition('.')
+    scaled = int((whole or '0') + fraction[:decimals].ljust(decimals, '0'))
+    if len(fraction) > decimals and fraction[decimals] >= '5':
+        scaled += 1
+    return -scaled if negative else scaled
+
+
+def scale_all(values, decimals):
+    """
+    Returns the list of ``values`` scaled by ``10 ** decimals``.
+
+    Bitstamp formats prices and amounts with exactly the decimals of the
+    pair, in which case dropping the dot of every value in one comprehension
+    is about as fast as building :class:`decimal.Decimal` objects.
+    """
+    if decimals:
+        mark = -decimals - 1
+        try:
+            scaled = [int(v.replace('.', '')) for v in values
+                      if v[mark] == '.']
+        except (IndexError, TypeError, AttributeError, ValueError):
+            scaled = None
+        if scaled is not None and len(scaled) == len(values):
+            return scaled
+    return [to_scaled(v, decimals) for v in values]
+
+
+def from_scaled(value, decimals):
+    """
+    Returns the scaled integer ``value`` as a decimal string, the format
+    expected by the API.
+    """
+    sign = '-' if value < 0 else ''
+    digits = str(abs(value)).rjust(decimals + 1, '0')
+    if not decimals:
+        return sign + digits
+    return sign + digits[:-decimals] + '.' + digits[-decimals:]
+
+
+class FixedPoint(object):
+    """
+    Converts responses and order arguments of each pair between strings and
+    scaled integers, from the ``trading_pairs_info()`` list.
+    """
+
+    def __init__(self, pairs_info):
+        self.scales = dict(
+            (pair['url_symbol'],
+             (int(pair['base_decimals']), int(pair['counter_decimals'])))
+            for pair in pairs_info)
+
+    def _scales(self, pair):
+        try:
+            return self.scales[pair]
+        except KeyError:
+            raise ValueError("Unknown trading pair: {}".format(pair))
+
+    def price(self, pair, value):
+        return to_scaled(value, self._scales(pair)[1])
+
+    def amount(self, pair, value):
+        return to_scaled(value, self._scales(pair)[0])
+
+    def format_price(self, pair, value):
+        return from_scaled(value, self._scales(pair)[1])
+
+    def format_amount(self, pair, value):
+        return from_scaled(value, self._scales(pair)[0])
+
+    def ticker(self, pair, ticker):
+        """
+        Returns a copy of ``ticker`` with prices and volume scaled.
+        """
+        amount_decimals, price_decimals = self._scales(pair)
+        result = dict(ticker)
+        for field in PRICE_FIELDS:
+            if result.get(field) is not None:
+                result[field] = to_scaled(result[field], price_decimals)
+        if result.get('volume') is not None:
+            result['volume'] = to_scaled(result['volume'], amount_decimals)
+        return result
+
+    def order_book(self, pair, book):
+        """
+        Returns a copy of ``book`` with the price and amount of each level
+        scaled. Any other column, like the order id of ``group=2`` books, is
+        kept.
+        """
+        amount_decimals, price_decimals = self._scales(pair)
+        result = dict(book)
+        for side in ('bids', 'asks'):
+            levels = book[side]
+            prices = scale_all([level[0] for level in levels], price_decimals)
+            amounts = scale_all([level[1] for level in levels],
+                                amount_decimals)
+            if any(len(level) > 2 for level in levels):
+                result[side] = [[price, amount] + list(level[2:])
+                                for price, amount, level
+                                in zip(prices, amounts, levels)]
+            else:
+                result[side] = [[price, amount]
+                                for price, amount in zip(prices, amounts)]
+        return result
+
+    def transactions(self, pair, trades):
+        """
+        Returns copies of the ``trades`` with price and amount scaled.
+        """
+        amount_decimals, price_decimals = self._scales(pair)
+        prices = scale_all([t['price'] for t in trades], price_decimals)
+        amounts = scale_all([t['amount'] for t in trades], amount_decimals)
+        result = []
+        for trade, price, amount in zip(trades, prices, amounts):
+            trade = dict(trade)
+            trade['price'] = price
+            trade['amount'] = amount
+            result.append(trade)
+        return result
@@ -0,0 +1,203 @@
+"""
+Incremental local copy of the account history in SQLite.
+"""
+import datetime
+import json
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_transactions (
+    id INTEGER PRIMARY KEY,
+    datetime TEXT NOT NULL,
+    type INTEGER,
+    pair TEXT,
+    order_id INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS user_transactions_datetime
+    ON user_transactions (datetime);
+CREATE INDEX IF NOT EXISTS user_transactions_pair
+    ON user_transactions (pair, datetime);
+CREATE TABLE IF NOT EXISTS withdrawal_requests (
+    id INTEGER PRIMARY KEY,
+    datetime TEXT NOT NULL,
+    status INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS withdrawal_requests_datetime
+    ON withdrawal_requests (datetime);
+CREATE TABLE IF NOT EXISTS sync_state (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _pair(transaction):
+    """
+    Returns the pair of a trade ('btcusd') from its rate key ('btc_usd'), or
+    None for deposits and withdrawals.
+    """
+    for key in transaction:
+        if '_' in key and key != 'order_id':
+            base, _, quote = key.partition('_')
+            if base in transaction and quote in transaction:
+                return base + quote
+    return None
+
+
+def _normalize_pair(pair):
+    return pair.replace('/', '').replace('_', '').lower()
+
+
+def _time(value):
+    """
+    Returns a datetime bound as stored by Bitstamp ('2013-03-26 18:49:13').
+    """
+    if isinstance(value, datetime.datetime):
+        if value.microsecond:
+            return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return value
+
+
+class HistoryStore(object):
+    """
+    SQLite store of user transactions and withdrawal requests, indexed by
+    id, pair and datetime. The full API dictionaries are kept as json.
+    """
+
+    def __init__(self, path=':memory:'):
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def get_state(self, name, default=None):
+        row = self.db.execute(
+            "SELECT value FROM sync_state WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_state(self, name, value):
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO sync_state (name, value) "
+                "VALUES (?, ?)", (name, json.dumps(value)))
+
+    def last_transaction_id(self):
+        return self.db.execute(
+            "SELECT MAX(id) FROM user_transactions").fetchone()[0]
+
+    def add_transactions(self, transactions):
+        """
+        Insert user transactions, returning the number of ids that were not
+        stored yet.
+        """
+        before = self.db.total_changes
+        with self.db:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO user_transactions "
+                "(id, datetime, type, pair, order_id, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(int(t['id']), t['datetime'], int(t['type']), _pair(t),
+                  t.get('order_id'), json.dumps(t)) for t in transactions])
+        return self.db.total_changes - before
+
+    def add_withdrawals(self, withdrawals):
+        """
+        Insert or update withdrawal requests, whose status changes over time.
+        """
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO withdrawal_requests "
+                "(id, datetime, status, data) VALUES (?, ?, ?, ?)",
+                [(int(w['id']), w['datetime'], w.get('status'),
+                  json.dumps(w)) for w in withdrawals])
+
+    def _query(self, table, start, end, pair=None, limit=None):
+        sql = "SELECT data FROM {} WHERE 1".format(table)
+        args = []
+        if pair is not None:
+            sql += " AND pair = ?"
+            args.append(_normalize_pair(pair))
+        if start is not None:
+            sql += " AND datetime >= ?"
+            args.append(_time(start))
+        if end is not None:
+            sql += " AND datetime < ?"
+            args.append(_time(end))
+        sql += " ORDER BY datetime, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        return [json.loads(row[0]) for row in self.db.execute(sql, args)]
+
+    def transactions(self, start=None, end=None, pair=None, limit=None):
+        """
+        Returns the stored user transactions with ``start <= datetime < end``,
+        optionally of a single ``pair`` ('btcusd', 'BTC/USD'), oldest first.
+        Bounds are datetimes or strings in Bitstamp's format.
+        """
+        return self._query('user_transactions', start, end, pair, limit)
+
+    def withdrawals(self, start=None, end=None, limit=None):
+        """
+        Returns the stored withdrawal requests, like :meth:`transactions`.
+        """
+        return self._query('withdrawal_requests', start, end, limit=limit)
+
+
+class HistorySync(object):
+    """
+    Copies the account history of a :class:`bitstamp.client.Trading` client
+    into a :class:`HistoryStore`, only fetching what is new on each run.
+    """
+    # Largest timedelta accepted by withdrawal_requests.
+    max_timedelta = 50000000
+    # Withdrawal requests are refetched this many seconds back, to catch
+    # status changes of recent requests.
+    overlap = 86400
+
+    def __init__(self, client, store, page_size=1000):
+        self.client = client
+        self.store = store
+        self.page_size = page_size
+
+    def sync_transactions(self):
+        """
+        Fetch the user transactions newer than the last stored one and return
+        the number of new transactions.
+        """
+        added = 0
+        last_id = self.store.last_transaction_id()
+        while True:
+            # The first sync starts from the oldest transaction.
+            batch = self.client.user_transactions(
+                limit=self.page_size, descending=False, since_id=last_id)
+            new = self.store.add_transactions(batch)
+            added += new
+            if not new or len(batch) < self.page_size:
+                return added
+            last_id = self.store.last_transaction_id()
+
+    def sync_withdrawals(self):
+        """
+        Fetch the withdrawal requests made since the last sync.
+        """
+        now = int(self.client.server_time())
+        last = self.store.get_state('withdrawals_synced_at')
+        if last is None:
+            timedelta = self.max_timedelta
+        else:
+            timedelta = min(now - last + self.overlap, self.max_timedelta)
+        withdrawals = self.client.withdrawal_requests(timedelta=timedelta)
+        self.store.add_withdrawals(withdrawals)
+        self.store.set_state('withdrawals_synced_at', now)
+        return len(withdrawals)
+
+    def sync(self):
+        """
+        Sync user transactions and withdrawal requests.
+        """
+        return self.sync_transactions(), self.sync_withdrawals()
@@ -0,0 +1,100 @@
+"""
+Deltas between successive ``order_book()`` snapshots.
+"""
+ADD = 'add'
+CHANGE = 'change'
+REMOVE = 'remove'
+
+# Bids are sorted best (highest) price first, asks lowest first.
+SIDES = (('bids', True), ('asks', False))
+
+
+def diff_side(side, old, new, descending):
+    """
+    Returns the deltas turning the ``old`` levels of ``side`` into ``new``,
+    with one merge pass over both sorted level lists.
+
+    Each delta is a ``(side, action, price, amount)`` tuple, amount being
+    '0' for removed levels.
+    """
+    deltas = []
+    i = j = 0
+    n_old, n_new = len(old), len(new)
+    while i < n_old and j < n_new:
+        old_price, old_amount = old[i][0], old[i][1]
+        new_price, new_amount = new[j][0], new[j][1]
+        po, pn = float(old_price), float(new_price)
+        if po == pn:
+            if float(old_amount) != float(new_amount):
+                deltas.append((side, CHANGE, new_price, new_amount))
+            i += 1
+            j += 1
+        elif (po > pn) == descending:
+            deltas.append((side, REMOVE, old_price, '0'))
+            i += 1
+        else:
+            deltas.append((side, ADD, new_price, new_amount))
+            j += 1
+    for level in old[i:]:
+        deltas.append((side, REMOVE, level[0], '0'))
+    for level in new[j:]:
+        deltas.append((side, ADD, level[0], level[1]))
+    return deltas
+
+
+def diff_order_book(old, new):
+    """
+    Returns the deltas of both sides between two ``order_book()`` snapshots.
+    """
+    deltas = []
+    for side, descending in SIDES:
+        deltas.extend(diff_side(side, old[side], new[side], descending))
+    return deltas
+
+
+def apply_deltas(book, deltas):
+    """
+    Returns a new order book with ``deltas`` applied to ``book``, for
+    consumers receiving deltas instead of snapshots.
+
+    Levels are matched on their numeric price like in :func:`diff_side`, so
+    '102.0' and '102.00' are the same level; the price string of the latest
+    delta is kept.
+    """
+    levels = dict((side, dict((float(level[0]), [level[0], level[1]])
+                              for level in book[side]))
+                  for side, _ in SIDES)
+    for side, action, price, amount in deltas:
+        if action == REMOVE:
+            levels[side].pop(float(price), None)
+        else:
+            levels[side][float(price)] = [price, amount]
+    result = dict(book)
+    for side, descending in SIDES:
+        result[side] = [level for _, level in
+                        sorted(levels[side].items(), reverse=descending)]
+    return result
+
+
+class OrderBookDiffer(object):
+    """
+    Keeps the last ``order_book()`` snapshot of a pair and returns the deltas
+    of each new one. The first snapshot yields an add for every level, and
+    snapshots with an older timestamp than the last one are ignored.
+    """
+
+    def __init__(self):
+        self.book = {'bids': [], 'asks': []}
+        self.timestamp = None
+
+    def update(self, snapshot):
+        timestamp = snapshot.get('microtimestamp') or \
+            snapshot.get('timestamp')
+        if timestamp is not None:
+            timestamp = int(timestamp)
+            if self.timestamp is not None and timestamp < self.timestamp:
+                return []
+            self.timestamp = timestamp
+        deltas = diff_order_book(self.book, snapshot)
+        self.book = snapshot
+        return deltas
@@ -0,0 +1,123 @@
+"""
+Implied conversion rates between all currencies from ticker bid/ask prices.
+"""
+
+
+class RateMatrix(object):
+    """
+    Dense currency by currency matrix of direct conversion rates.
+
+    ``rates[i][j]`` is the amount of currency ``j`` received for one unit of
+    currency ``i``: selling a BASE/QUOTE pair at the bid converts BASE to
+    QUOTE, buying at the ask converts QUOTE to BASE. A ``fee`` fraction is
+    charged on every conversion.
+
+    :meth:`refresh` loads every pair with a single ``all_tickers`` request and
+    :meth:`update` applies one pair's ticker. Best rates over up to
+    ``max_hops`` conversions are computed with max-product matrix
+    multiplication and cached until a rate changes.
+    """
+
+    def __init__(self, client=None, fee=0.0, max_hops=3):
+        self.client = client
+        self.fee = fee
+        self.max_hops = max_hops
+        self.currencies = []
+        self.index = {}
+        self.rates = []
+        self._best = None
+
+    def _currency(self, currency):
+        currency = currency.upper()
+        i = self.index.get(currency)
+        if i is None:
+            i = self.index[currency] = len(self.currencies)
+            self.currencies.append(currency)
+            for row in self.rates:
+                row.append(0.0)
+            self.rates.append([0.0] * len(self.currencies))
+        return i
+
+    def update(self, pair, ticker):
+        """
+        Apply the ticker of ``pair`` (e.g. 'BTC/USD').
+        """
+        base, quote = pair.split('/')
+        i, j = self._currency(base), self._currency(quote)
+        bid, ask = float(ticker['bid']), float(ticker['ask'])
+        keep = 1.0 - self.fee
+        self.rates[i][j] = bid * keep if bid > 0 else 0.0
+        self.rates[j][i] = keep / ask if ask > 0 else 0.0
+        self._best = None
+
+    def refresh(self):
+        """
+        Reload every pair from the client's ``all_tickers``.
+        """
+        for ticker in self.client.all_tickers():
+            self.update(ticker['pair'], ticker)
+
+    def _multiply(self, best, paths):
+        """
+        One max-product step: extend every best path by one conversion.
+        """
+        rates = self.rates
+        n = len(rates)
+        new_best = [row[:] for row in best]
+        new_paths = [row[:] for row in paths]
+        for i in range(n):
+            row = best[i]
+            for m in range(n):
+                through = row[m]
+                if not through:
+                    continue
+                hop = rates[m]
+                for j in range(n):
+                    value = through * hop[j]
+                    if value > new_best[i][j]:
+                        new_best[i][j] = value
+                        new_paths[i][j] = paths[i][m] + (j,)
+        return new_best, new_paths
+
+    def best(self):
+        """
+        Returns ``(best, paths)`` matrices: the best rate from currency ``i``
+        to ``j`` over up to ``max_hops`` conversions, and the index path
+        achieving it. The diagonal holds the best cycle gain.
+        """
+        if self._best is None:
+            n = len(self.rates)
+            best = [row[:] for row in self.rates]
+            paths = [[(i, j) if best[i][j] else None for j in range(n)]
+                     for i in range(n)]
+            for _ in range(self.max_hops - 1):
+                best, paths = self._multiply(best, paths)
+            self._best = best, paths
+        return self._best
+
+    def convert(self, source, target):
+        """
+        Returns ``(rate, path)`` of the best conversion from ``source`` to
+        ``target``, path being the list of currencies traversed. The rate is
+        0 when there is no path.
+        """
+        best, paths = self.best()
+        i, j = self.index[source.upper()], self.index[target.upper()]
+        path = paths[i][j]
+        if path is None:
+            return 0.0, []
+        return best[i][j], [self.currencies[k] for k in path]
+
+    def cycles(self, min_gain=1.0):
+        """
+        Returns list of ``(gain, path)`` for the conversion cycles returning
+        more than ``min_gain`` times the starting amount, best first.
+        """
+        best, paths = self.best()
+        found = []
+        for i in range(len(self.currencies)):
+            if best[i][i] > min_gain:
+                found.append((best[i][i],
+                              [self.currencies[k] for k in paths[i][i]]))
+        found.sort(key=lambda cycle: -cycle[0])
+        return found
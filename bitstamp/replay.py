@@ -0,0 +1,141 @@
+"""
+Recording of API traffic and offline replay, for load testing.
+
+:class:`RecordingTransport` wraps the transport of a client and appends each
+request/response pair to a file, one json object per line.
+:class:`ReplayTransport` serves them back, so :class:`bitstamp.client.Public`
+and :class:`bitstamp.client.Trading` can be driven offline at any rate::
+
+    recorder = RecordingTransport('session.ndjson')
+    client = bitstamp.client.Public(transport=recorder)
+    ...
+    recorder.close()
+
+    client = bitstamp.client.Public(
+        transport=ReplayTransport('session.ndjson', speed=None))
+"""
+import base64
+import io
+import itertools
+import json
+import threading
+import time
+from timeit import default_timer
+
+from bitstamp.transport import Transport, build_response, get_transport
+
+# Request data changing on every call, left out of recordings and matching.
+VOLATILE_DATA = ('key', 'signature', 'nonce')
+
+
+def _stable(values):
+    """
+    Returns the request parameters as a sorted list of string pairs.
+    """
+    if not values:
+        return []
+    return sorted((str(k), str(v)) for k, v in values.items()
+                  if v is not None and k not in VOLATILE_DATA)
+
+
+def _key(method, url, params, data):
+    return (method, url, tuple(map(tuple, params)), tuple(map(tuple, data)))
+
+
+class RecordingTransport(Transport):
+    """
+    Transport recording the traffic of the wrapped ``transport`` (any value
+    accepted by the client's ``transport`` argument) into the file at
+    ``path``.
+    """
+    name = 'recording'
+
+    def __init__(self, path, transport=None):
+        self.transport = get_transport(transport)
+        self.timeout_exceptions = self.transport.timeout_exceptions
+        self.file = io.open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def request(self, method, url, params=None, data=None, proxies=None,
+                timeout=None):
+        sent = time.time()
+        start = default_timer()
+        response = self.transport.request(method, url, params=params,
+                                          data=data, proxies=proxies,
+                                          timeout=timeout)
+        duration = default_timer() - start
+        record = {'method': method, 'url': url,
+                  'params': _stable(params), 'data': _stable(data),
+                  'time': sent, 'duration': duration,
+                  'status_code': response.status_code,
+                  'reason': response.reason,
+                  'headers': dict(response.headers)}
+        try:
+            record['content'] = response.content.decode('utf-8')
+        except UnicodeDecodeError:
+            record['content_base64'] = base64.b64encode(
+                response.content).decode('ascii')
+        line = json.dumps(record, sort_keys=True)
+        with self._lock:
+            self.file.write(line + u'\n')
+            self.file.flush()
+        return response
+
+    def close(self):
+        self.file.close()
+        self.transport.close()
+
+
+class ReplayTransport(Transport):
+    """
+    Transport serving the responses recorded by :class:`RecordingTransport`
+    in the file at ``path``.
+
+    Requests are matched on method, URL and parameters (ignoring the nonce
+    and signature); when nothing matches exactly, on method and URL alone.
+    Several recordings of one request are served in turn, cycling forever.
+    Unmatched requests get a 404 response.
+
+    With ``speed`` set, each response is delayed by its recorded duration
+    divided by ``speed`` (1.0 replays the original latency). With ``speed``
+    None responses are returned immediately.
+    """
+    name = 'replay'
+    timeout_exceptions = ()
+
+    def __init__(self, path, speed=None):
+        self.speed = speed
+        recorded = {}
+        with io.open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    key = _key(record['method'], record['url'],
+                               record['params'], record['data'])
+                    recorded.setdefault(key, []).append(record)
+        self.records = dict((key, itertools.cycle(records))
+                            for key, records in recorded.items())
+        self.by_url = {}
+        for key, records in recorded.items():
+            self.by_url.setdefault(key[:2], []).extend(records)
+        self.by_url = dict((key, itertools.cycle(records))
+                           for key, records in self.by_url.items())
+        self.count = sum(len(records) for records in recorded.values())
+        self._lock = threading.Lock()
+
+    def request(self, method, url, params=None, data=None, proxies=None,
+                timeout=None):
+        key = _key(method, url, _stable(params), _stable(data))
+        with self._lock:
+            records = self.records.get(key) or self.by_url.get(key[:2])
+            record = next(records) if records is not None else None
+        if record is None:
+            return build_response(url, 404, 'Not Found', None, b'')
+        if self.speed:
+            time.sleep(record['duration'] / self.speed)
+        if 'content' in record:
+            content = record['content'].encode('utf-8')
+        else:
+            content = base64.b64decode(record['content_base64'])
+        return build_response(url, record['status_code'], record['reason'],
+                              record['headers'], content, record['duration'])
@@ -0,0 +1,79 @@
+"""
+Per request timing traces.
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+import time
+from timeit import default_timer
+
+
+class RequestTrace(object):
+    """
+    Span-like record of one API request, passed to the hooks registered with
+    :meth:`bitstamp.client.BaseClient.add_trace_hook` once it completed.
+
+    ``phases`` maps phase names to seconds, in the order they happened:
+
+    sign
+        building the signed POST data (:class:`bitstamp.client.Trading`)
+    wait
+        from sending the request until the response headers arrived,
+        including connection setup and TLS handshake when a new connection
+        was opened
+    download
+        reading the response body
+    decode
+        decoding the json body
+
+    ``error`` holds the exception raised by the request, if any.
+    """
+
+    def __init__(self, method, endpoint):
+        self.method = method
+        self.endpoint = endpoint
+        self.url = None
+        self.nonce = None
+        self.status_code = None
+        self.error = None
+        self.phases = OrderedDict()
+        self.start = time.time()
+        self.end = None
+        self._timer = default_timer()
+
+    @property
+    def duration(self):
+        """
+        Seconds from the creation of the trace until :meth:`finish`.
+        """
+        if self.end is None:
+            return None
+        return self.end - self.start
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Context manager adding the time spent in the block to phase ``name``.
+        """
+        start = default_timer()
+        try:
+            yield
+        finally:
+            self.add(name, default_timer() - start)
+
+    def finish(self):
+        self.end = self.start + (default_timer() - self._timer)
+
+    def as_dict(self):
+        return {'method': self.method, 'endpoint': self.endpoint,
+                'url': self.url, 'nonce': self.nonce,
+                'status_code': self.status_code,
+                'error': repr(self.error) if self.error else None,
+                'start': self.start, 'duration': self.duration,
+                'phases': dict(self.phases)}
+
+    def __repr__(self):
+        return '<RequestTrace {} {} {}>'.format(
+            self.method, self.endpoint, self.status_code)
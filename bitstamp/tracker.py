@@ -0,0 +1,147 @@
+"""
+Batch tracking of order status changes.
+"""
+import logging
+import threading
+
+import requests
+
+from bitstamp.client import BitstampError
+
+logger = logging.getLogger(__name__)
+
+
+class OrderEvent(object):
+    """
+    A change of state of a tracked order.
+
+    ``order`` is the last open order dictionary seen for the order and
+    ``status`` the ``order_status`` response once it left the order book.
+    """
+    FILL = 'fill'
+    PARTIAL_FILL = 'partial_fill'
+    CANCEL = 'cancel'
+    EXPIRE = 'expire'
+
+    def __init__(self, kind, order_id, order=None, status=None):
+        self.kind = kind
+        self.order_id = order_id
+        self.order = order
+        self.status = status
+
+    def __repr__(self):
+        return 'OrderEvent({!r}, {!r})'.format(self.kind, self.order_id)
+
+
+class OrderTracker(object):
+    """
+    Watches a set of orders of a :class:`bitstamp.client.Trading` client.
+
+    Each :meth:`poll` makes a single ``all_open_orders`` request and compares
+    it with the previous one: a decreased amount is a partial fill, and only
+    the orders that disappeared are looked up with ``order_status`` to tell a
+    fill from a cancel. Finished orders stop being watched.
+
+    The poll interval drops to ``min_interval`` when a cycle produced events
+    and grows by ``backoff`` up to ``max_interval`` while nothing happens.
+    """
+
+    def __init__(self, client, min_interval=1.0, max_interval=30.0,
+                 backoff=2.0):
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+        self.orders = {}
+        self.listeners = []
+
+    def watch(self, order_id, order=None):
+        """
+        Start tracking ``order_id``, optionally with the order dictionary
+        returned when it was placed.
+        """
+        self.orders[str(order_id)] = order
+
+    def unwatch(self, order_id):
+        """
+        Stop tracking ``order_id``.
+        """
+        self.orders.pop(str(order_id), None)
+
+    def add_listener(self, callback):
+        """
+        Register ``callback`` to be called with each :class:`OrderEvent`.
+        """
+        self.listeners.append(callback)
+
+    def _emit(self, event):
+        for callback in self.listeners:
+            callback(event)
+
+    def _resolve(self, order_id, order):
+        """
+        Look up an order that is no longer open. Returns None while Bitstamp
+        still reports it as open, or when the lookup failed.
+        """
+        try:
+            status = self.client.order_status(order_id)
+        except (BitstampError, requests.RequestException) as e:
+            logger.warning("order_status failed for %s: %s", order_id, e)
+            return None
+        state = status.get('status')
+        if state == 'Finished' and status.get('transactions'):
+            return OrderEvent(OrderEvent.FILL, order_id, order, status)
+        if state in ('Finished', 'Canceled'):
+            return OrderEvent(OrderEvent.CANCEL, order_id, order, status)
+        if state == 'Expired':
+            return OrderEvent(OrderEvent.EXPIRE, order_id, order, status)
+        return None
+
+    def poll(self):
+        """
+        Run one tracking cycle and return the list of events it produced.
+        """
+        if not self.orders:
+            return []
+        open_orders = dict((str(order['id']), order)
+                           for order in self.client.all_open_orders())
+        events = []
+        for order_id, previous in list(self.orders.items()):
+            current = open_orders.get(order_id)
+            if current is not None:
+                if (previous is not None and
+                        float(current['amount']) < float(previous['amount'])):
+                    events.append(OrderEvent(
+                        OrderEvent.PARTIAL_FILL, order_id, current))
+                self.orders[order_id] = current
+                continue
+            event = self._resolve(order_id, previous)
+            if event is not None:
+                del self.orders[order_id]
+                events.append(event)
+
+        if events:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff,
+                                self.max_interval)
+        for event in events:
+            self._emit(event)
+        return events
+
+    def run(self, stop_event=None):
+        """
+        Poll until every order finished or ``stop_event`` (a
+        :class:`threading.Event`) is set. Failed polls are logged and retried
+        after backing off.
+        """
+        stop_event = stop_event or threading.Event()
+        while self.orders and not stop_event.is_set():
+            try:
+                self.poll()
+            except (BitstampError, requests.RequestException) as e:
+                logger.error("Order tracking poll failed: %s", e)
+                self.interval = min(self.interval * self.backoff,
+                                    self.max_interval)
+            stop_event.wait(self.interval)
@@ -0,0 +1,287 @@
+"""
+Transports used by :class:`bitstamp.client.BaseClient` to talk HTTP.
+
+A transport takes a method, an absolute URL and the query/form parameters and
+returns a :class:`requests.Response`, so the client code handling errors and
+json decoding does not depend on the HTTP library actually in use.
+"""
+from datetime import timedelta
+from timeit import default_timer
+
+import requests
+from requests.compat import urlencode
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+try:
+    import urllib3
+except ImportError:  # pragma: no cover
+    urllib3 = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+def _clean(values):
+    """
+    Drop parameters whose value is None, like requests does.
+    """
+    if not values:
+        return {}
+    return dict((k, v) for k, v in values.items() if v is not None)
+
+
+def _split_timeout(timeout):
+    """
+    Returns (connect, read) timeouts from a number or a tuple.
+    """
+    if isinstance(timeout, tuple):
+        return timeout
+    return timeout, timeout
+
+
+def build_response(url, status_code, reason, headers, content, elapsed=None):
+    """
+    Build a :class:`requests.Response` from the parts of a raw HTTP response.
+
+    ``elapsed`` is the number of seconds until the headers were received.
+    """
+    response = requests.Response()
+    if elapsed is not None:
+        response.elapsed = timedelta(seconds=elapsed)
+    response.url = url
+    response.status_code = status_code
+    response.reason = reason
+    response.headers = CaseInsensitiveDict(headers or {})
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = content
+    response._content_consumed = True
+    return response
+
+
+class Transport(object):
+    """
+    Base class of all transports.
+
+    Transports raise the exceptions of :attr:`timeout_exceptions` when a
+    timeout expires, and map any other failure of their HTTP library to
+    ``requests.ConnectionError``, so callers catching
+    ``requests.RequestException`` work with every transport.
+    """
+    name = None
+    # Exceptions raised by the transport when a connect or read timeout
+    # expires.
+    timeout_exceptions = ()
+
+    def request(self, method, url, params=None, data=None, proxies=None,
+                timeout=None):
+        """
+        Send the request and return a :class:`requests.Response`, with
+        ``elapsed`` set to the time until the headers were received when the
+        transport can measure it.
+
+        ``timeout`` is either a number of seconds or a (connect, read) tuple.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Release any connections held by the transport.
+        """
+
+
+class RequestsTransport(Transport):
+    """
+    Transport using the requests library.
+
+    Without a session the module level ``requests.get`` and ``requests.post``
+    functions are used, which open a new connection for every request. Pass a
+    :class:`requests.Session` to keep connections alive.
+    """
+    name = 'requests'
+    timeout_exceptions = (requests.Timeout,)
+
+    def __init__(self, session=None):
+        self.session = session
+
+    def request(self, method, url, params=None, data=None, proxies=None,
+                timeout=None):
+        if self.session is not None:
+            return self.session.request(
+                method, url, params=params, data=data, proxies=proxies,
+                timeout=timeout)
+        func = getattr(requests, method.lower())
+        return func(url, params=params, data=data, proxies=proxies,
+                    timeout=timeout)
+
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+
+
+class Urllib3Transport(Transport):
+    """
+    Transport calling urllib3 directly, skipping the per request overhead of
+    requests (hooks, cookie handling, environment lookups).
+    """
+    name = 'urllib3'
+
+    def __init__(self, maxsize=10, **pool_kwargs):
+        if urllib3 is None:  # pragma: no cover
+            raise ImportError("Urllib3Transport requires urllib3")
+        self.timeout_exceptions = (urllib3.exceptions.ReadTimeoutError,
+                                   urllib3.exceptions.ConnectTimeoutError)
+        self.pool = urllib3.PoolManager(maxsize=maxsize, **pool_kwargs)
+        self._proxies = {}
+
+    def _manager(self, url, proxies):
+        if not proxies:
+            return self.pool
+        proxy = proxies.get(url.split(':', 1)[0])
+        if not proxy:
+            return self.pool
+        if proxy not in self._proxies:
+            self._proxies[proxy] = urllib3.ProxyManager(proxy)
+        return self._proxies[proxy]
+
+    def request(self, method, url, params=None, data=None, proxies=None,
+                timeout=None):
+        params = _clean(params)
+        if params:
+            url = url + '?' + urlencode(params)
+        kwargs = {'retries': False, 'preload_content': False}
+        if timeout is not None:
+            connect, read = _split_timeout(timeout)
+            kwargs['timeout'] = urllib3.Timeout(connect=connect, read=read)
+        if method == 'POST':
+            kwargs['body'] = urlencode(_clean(data))
+            kwargs['headers'] = {
+                'Content-Type': 'application/x-www-form-urlencoded'}
+        start = default_timer()
+        try:
+            raw = self._manager(url, proxies).request(method, url, **kwargs)
+            elapsed = default_timer() - start
+            try:
+                content = raw.read()
+            finally:
+                raw.release_conn()
+        except urllib3.exceptions.NewConnectionError as e:
+            # Refused connections and DNS failures subclass
+            # ConnectTimeoutError but are no timeouts.
+            raise requests.ConnectionError(e)
+        except self.timeout_exceptions:
+            raise
+        except urllib3.exceptions.HTTPError as e:
+            raise requests.ConnectionError(e)
+        return build_response(url, raw.status, raw.reason, raw.headers,
+                              content, elapsed)
+
+    def close(self):
+        self.pool.clear()
+        for manager in self._proxies.values():
+            manager.clear()
+
+
+class HTTP2Transport(Transport):
+    """
+    Transport multiplexing requests over a single HTTP/2 connection, using
+    httpx (``pip install httpx[http2]``).
+
+    Proxies have to be configured on the httpx client passed as ``client``.
+    """
+    name = 'http2'
+
+    def __init__(self, client=None):
+        if httpx is None:
+            raise ImportError(
+                "HTTP2Transport requires httpx, install httpx[http2]")
+        self.timeout_exceptions = (httpx.TimeoutException,)
+        self.client = client or httpx.Client(http2=True)
+
+    def request(self, method, url, params=None, data=None, proxies=None,
+                timeout=None):
+        if proxies:
+            raise ValueError(
+                "HTTP2Transport ignores per request proxies, configure them "
+                "on the httpx client instead")
+        kwargs = {'params': _clean(params)}
+        if method == 'POST':
+            kwargs['data'] = _clean(data)
+        if timeout is not None:
+            connect, read = _split_timeout(timeout)
+            kwargs['timeout'] = httpx.Timeout(read, connect=connect)
+        try:
+            raw = self.client.request(method, url, **kwargs)
+        except self.timeout_exceptions:
+            raise
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(e)
+        return build_response(url, raw.status_code, raw.reason_phrase,
+                              raw.headers, raw.content)
+
+    def close(self):
+        self.client.close()
+
+
+class MemoryTransport(Transport):
+    """
+    In-memory transport serving canned responses, for tests and offline use.
+
+    Responses are registered with :meth:`add` and matched against the end of
+    the requested URL, so ``'ticker/btcusd/'`` matches the version 2 ticker
+    endpoint. Unmatched requests get a 404 response. Every request is kept in
+    :attr:`calls`.
+    """
+    name = 'memory'
+
+    def __init__(self):
+        self.routes = {}
+        self.calls = []
+
+    def add(self, method, path, content=b'', status_code=200, headers=None):
+        """
+        Register a response for ``method`` and ``path``.
+
+        ``content`` may be bytes, or a callable taking the request parameters
+        (method, url, params, data) and returning bytes.
+        """
+        self.routes[(method, path)] = (content, status_code, headers)
+
+    def request(self, method, url, params=None, data=None, proxies=None,
+                timeout=None):
+        self.calls.append({'method': method, 'url': url,
+                           'params': params, 'data': data})
+        path = url.split('?', 1)[0]
+        for (route_method, route_path), route in self.routes.items():
+            if route_method == method and path.endswith(route_path):
+                content, status_code, headers = route
+                if callable(content):
+                    content = content(method, url, params, data)
+                return build_response(url, status_code, 'OK', headers,
+                                      content)
+        return build_response(url, 404, 'Not Found', None, b'')
+
+
+TRANSPORTS = {
+    RequestsTransport.name: RequestsTransport,
+    Urllib3Transport.name: Urllib3Transport,
+    HTTP2Transport.name: HTTP2Transport,
+    MemoryTransport.name: MemoryTransport,
+}
+
+
+def get_transport(transport=None):
+    """
+    Returns a transport instance from an instance, a name from
+    :data:`TRANSPORTS` or None for the default requests transport.
+    """
+    if transport is None:
+        return RequestsTransport()
+    if isinstance(transport, Transport):
+        return transport
+    try:
+        return TRANSPORTS[transport]()
+    except KeyError:
+        raise ValueError("Unknown transport: {}".format(transport))
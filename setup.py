@@ -32,6 +32,9 @@ setup(
     install_requires=['requests'],
     tests_require=['tox'],
     cmdclass={'test': Tox},
+    entry_points={
+        'console_scripts': ['bitstamp-stream = bitstamp.cli:main'],
+    },
     long_description=README,
     long_description_content_type='text/x-rst'
 )
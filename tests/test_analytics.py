@@ -0,0 +1,88 @@
+import unittest
+
+import bitstamp.client
+from bitstamp.analytics import BookSide, MarketImpact
+from bitstamp.transport import MemoryTransport
+
+ORDER_BOOK = {
+    'timestamp': '1390424821',
+    'bids': [['99.00', '1.0'], ['98.00', '2.0'], ['95.00', '5.0']],
+    'asks': [['100.00', '1.0'], ['101.00', '2.0'], ['110.00', '5.0']],
+}
+
+
+class MarketImpactTests(unittest.TestCase):
+
+    def setUp(self):
+        self.impact = MarketImpact(ORDER_BOOK)
+
+    def test_depth(self):
+        self.assertEqual(self.impact.asks.depth, [1.0, 3.0, 8.0])
+        self.assertEqual(self.impact.bids.best, 99.0)
+
+    def test_fill_inside_best_level(self):
+        fill, = self.impact.buy(0.5)
+        self.assertEqual(fill['vwap'], 100.0)
+        self.assertEqual(fill['slippage'], 0.0)
+        self.assertEqual(fill['levels'], 1)
+
+    def test_fill_several_levels(self):
+        small, large = self.impact.buy(1.0, 2.0)
+        self.assertEqual(small['worst_price'], 100.0)
+        self.assertEqual(large['vwap'], 100.5)
+        self.assertEqual(large['worst_price'], 101.0)
+        self.assertAlmostEqual(large['slippage'], 0.005)
+
+    def test_sell(self):
+        fill, = self.impact.sell(3.0)
+        self.assertAlmostEqual(fill['vwap'], (99.0 + 196.0) / 3)
+        self.assertEqual(fill['worst_price'], 98.0)
+
+    def test_too_thin(self):
+        fill, = self.impact.buy(10.0)
+        self.assertEqual(fill['filled'], 8.0)
+        self.assertEqual(fill['worst_price'], 110.0)
+
+    def test_empty(self):
+        fill = BookSide([]).fill(1.0)
+        self.assertEqual(fill['filled'], 0.0)
+        self.assertIsNone(fill['vwap'])
+
+
+class MaxSlippageTests(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = MemoryTransport()
+        self.transport.add('GET', 'order_book/btcusd/', b'''{
+            "timestamp": "1390424821",
+            "bids": [["99.00", "1.0"], ["98.00", "2.0"]],
+            "asks": [["100.00", "1.0"], ["101.00", "2.0"]]}''')
+        self.transport.add('POST', 'buy/market/btcusd/', b'{"id": 1}')
+        self.transport.add('POST', 'sell/market/btcusd/', b'{"id": 2}')
+        self.client = bitstamp.client.Trading(
+            'USERNAME', 'KEY', 'SECRET', transport=self.transport)
+
+    def test_within_limit(self):
+        result = self.client.buy_market_order('2.0', max_slippage=0.01)
+        self.assertEqual(result, {'id': 1})
+
+    def test_above_limit(self):
+        self.assertRaises(bitstamp.client.SlippageError,
+                          self.client.sell_market_order, '2.0',
+                          max_slippage=0.001)
+        self.assertFalse(self.transport.calls[-1]['url'].endswith(
+            'sell/market/btcusd/'))
+
+    def test_too_thin(self):
+        self.assertRaises(bitstamp.client.SlippageError,
+                          self.client.buy_market_order, '5',
+                          max_slippage=1)
+
+    def test_non_positive_amount(self):
+        self.assertRaises(ValueError, self.client.buy_market_order, 0,
+                          max_slippage=0.01)
+        self.assertEqual(self.transport.calls, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+
+import bitstamp.client
+from bitstamp.bus import (BOOK, TICKER, TRADE, BusReader, BusWriter,
+                          MarketDataPublisher)
+from bitstamp.transport import MemoryTransport
+
+
+def read_latest(path, queue):
+    reader = BusReader(path)
+    queue.put(reader.latest(TICKER, 'btcusd').as_dict())
+    reader.close()
+
+
+class BusTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'bus')
+        self.writer = BusWriter(self.path, capacity=4)
+        self.reader = BusReader(self.path)
+
+    def tearDown(self):
+        self.reader.close()
+        self.writer.close()
+        shutil.rmtree(self.directory)
+
+    def test_latest(self):
+        self.writer.write(TICKER, 'btcusd', (1, 2, 3, 4), 100)
+        self.writer.write(TICKER, 'ethusd', (5, 6, 7, 8), 100)
+        self.writer.write(TRADE, 'btcusd', (1.5, 0.1, 0), 101, id=7)
+        record = self.reader.latest(TICKER, 'btcusd')
+        self.assertEqual(record.as_dict(), {
+            'pair': 'btcusd', 'timestamp': 100.0,
+            'bid': 1.0, 'ask': 2.0, 'last': 3.0, 'volume': 4.0})
+        self.assertEqual(self.reader.latest(TRADE, 'btcusd').as_dict()['tid'],
+                         7)
+        self.assertIsNone(self.reader.latest(BOOK, 'btcusd'))
+
+    def test_ring_overwrite(self):
+        for n in range(6):
+            self.writer.write(TRADE, 'btcusd', (n, 1, 0), 100, id=n)
+        self.assertEqual(self.reader.head(), 6)
+        records = self.reader.read_since(0)
+        self.assertEqual([r.id for r in records], [2, 3, 4, 5])
+        self.assertEqual([r.id for r in self.reader.read_since(5)], [5])
+
+    def test_torn_record_skipped(self):
+        self.writer.write(TICKER, 'btcusd', (1, 2, 3, 4), 100)
+        self.writer.map[self.writer._offset(1):self.writer._offset(1) + 8] = \
+            b'\0' * 8
+        self.assertEqual(self.reader.read_since(0), [])
+
+    def test_writer_restart(self):
+        for n in range(5):
+            self.writer.write(TRADE, 'btcusd', (n, 1, 0), 100, id=n)
+        self.assertEqual(self.reader.read_since(0)[-1].seq, 5)
+        generation = self.reader.generation
+        self.writer.close()
+        self.writer = BusWriter(self.path, capacity=4)
+        self.writer.write(TRADE, 'btcusd', (5, 1, 0), 100, id=5)
+        records = self.reader.read_since(5)
+        self.assertEqual([(r.seq, r.id) for r in records], [(6, 5)])
+        self.assertNotEqual(self.reader.generation, generation)
+        self.assertEqual(os.listdir(self.directory), ['bus'])
+
+    def test_bad_file(self):
+        with open(self.path + '.bad', 'wb') as f:
+            f.write(b'\0' * 64)
+        self.assertRaises(ValueError, BusReader, self.path + '.bad')
+
+    def test_other_process(self):
+        self.writer.write(TICKER, 'btcusd', (1, 2, 3, 4), 100)
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=read_latest,
+                                          args=(self.path, queue))
+        process.start()
+        result = queue.get(timeout=10)
+        process.join()
+        self.assertEqual(result['ask'], 2.0)
+
+    def test_publisher(self):
+        transport = MemoryTransport()
+        transport.add('GET', 'ticker/btcusd/', b'''{"bid": "10", "ask": "11",
+            "last": "10.5", "volume": "100", "timestamp": "1000"}''')
+        transport.add('GET', 'order_book/btcusd/', b'''{"timestamp": "1000",
+            "bids": [["10", "1.5"]], "asks": [["11", "2.5"]]}''')
+        transport.add('GET', 'transactions/btcusd/', b'''[
+            {"tid": 2, "date": "999", "price": "10.5", "amount": "1",
+             "type": "1"},
+            {"tid": 1, "date": "998", "price": "10.4", "amount": "2",
+             "type": "0"}]''')
+        client = bitstamp.client.Public(transport=transport)
+        publisher = MarketDataPublisher(client, [('btc', 'usd')], self.writer)
+        publisher.publish()
+        publisher.publish()
+        book = self.reader.latest(BOOK, 'btcusd').as_dict()
+        self.assertEqual(book['ask_amount'], 2.5)
+        trades = [r for r in self.reader.read_since(0) if r.kind == TRADE]
+        self.assertEqual([r.id for r in trades], [1, 2])
+
+    def test_publisher_error(self):
+        transport = MemoryTransport()
+        transport.add('GET', 'ticker/ethusd/', status_code=500)
+        transport.add('GET', 'ticker/btcusd/', b'''{"bid": "10", "ask": "11",
+            "last": "10.5", "volume": "100", "timestamp": "1000"}''')
+        client = bitstamp.client.Public(transport=transport)
+        publisher = MarketDataPublisher(
+            client, [('eth', 'usd'), ('btc', 'usd')], self.writer,
+            book=False, trades=False)
+        publisher.publish()
+        self.assertIsNone(self.reader.latest(TICKER, 'ethusd'))
+        self.assertEqual(self.reader.latest(TICKER, 'btcusd').as_dict()['last'],
+                         10.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+from bitstamp.candles import CandleAggregator
+
+
+def trade(tid, date, price, amount):
+    return {'tid': tid, 'date': str(date), 'price': price, 'amount': amount,
+            'type': '0'}
+
+
+class CandleAggregatorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.candles = CandleAggregator(steps=(60, 300))
+
+    def test_bars(self):
+        # transactions() returns the newest trades first
+        self.candles.add_trades([
+            trade(4, 1019, '99.00', '0.5'),
+            trade(3, 1018, '103.00', '1.0'),
+            trade(2, 1005, '101.00', '2.0'),
+            trade(1, 959, '100.00', '1.0'),
+        ])
+        self.assertEqual(self.candles.ohlc(60), {'data': {
+            'pair': 'BTC/USD',
+            'ohlc': [
+                {'timestamp': '900', 'open': '100.00', 'high': '100.00',
+                 'low': '100.00', 'close': '100.00', 'volume': '1.0'},
+                {'timestamp': '960', 'open': '101.00', 'high': '103.00',
+                 'low': '99.00', 'close': '99.00', 'volume': '3.5'},
+            ]}})
+        self.assertEqual(self.candles.current(300)['volume'], '4.5')
+        self.assertEqual(self.candles.current(300)['timestamp'], '900')
+
+    def test_duplicates_ignored(self):
+        batch = [trade(2, 1005, '101.00', '2.0'),
+                 trade(1, 1001, '100.00', '1.0')]
+        self.candles.add_trades(batch)
+        self.candles.add_trades([trade(3, 1010, '102.00', '1.0')] + batch)
+        self.assertEqual(self.candles.current(60)['volume'], '4.0')
+        self.assertEqual(self.candles.current(60)['close'], '102.00')
+
+    def test_incremental(self):
+        self.candles.add_trade(trade(1, 1001, '100.00', '1.0'))
+        self.assertEqual(self.candles.current(60)['high'], '100.00')
+        self.candles.add_trade(trade(2, 1002, '105.00', '1.0'))
+        self.assertEqual(self.candles.current(60)['high'], '105.00')
+        self.assertEqual(self.candles.current(60)['open'], '100.00')
+
+    def test_seed(self):
+        response = {'data': {'pair': 'BTC/USD', 'ohlc': [
+            {'timestamp': '60', 'open': '1', 'high': '2', 'low': '1',
+             'close': '2', 'volume': '10'},
+            {'timestamp': '120', 'open': '2', 'high': '2', 'low': '2',
+             'close': '2', 'volume': '1'},
+        ]}}
+        self.candles.seed(response, 60)
+        self.candles.add_trades([trade(1, 70, '9', '5'),
+                                 trade(2, 130, '3', '4')])
+        rows = self.candles.ohlc(60)['data']['ohlc']
+        self.assertEqual([row['timestamp'] for row in rows], ['60', '120'])
+        self.assertEqual(rows[0]['volume'], '10')
+        self.assertEqual(rows[1]['volume'], '4')
+
+    def test_limits(self):
+        candles = CandleAggregator(steps=(60,), max_bars=2)
+        candles.add_trades([trade(i, i * 60, '1', '1') for i in range(1, 5)])
+        rows = candles.ohlc(60)['data']['ohlc']
+        self.assertEqual([row['timestamp'] for row in rows], ['180', '240'])
+        rows = candles.ohlc(60, limit=1)['data']['ohlc']
+        self.assertEqual([row['timestamp'] for row in rows], ['240'])
+        self.assertEqual(candles.ohlc(60, end=200)['data']['ohlc'][0]
+                         ['timestamp'], '180')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import io
+import json
+import struct
+import threading
+import unittest
+
+import bitstamp.client
+from bitstamp.cli import HEADER, Streamer, parse_args, split_pair
+from bitstamp.transport import MemoryTransport
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+
+class DroppingHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        # Close the connection without answering.
+        pass
+
+    def log_message(self, *args):
+        pass
+
+
+class StreamerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = MemoryTransport()
+        self.transport.add('GET', 'ticker/btcusd/', b'''{"last": "816.44",
+            "bid": "815.09", "ask": "816.44", "volume": "8700.01",
+            "timestamp": "1390425002"}''')
+        self.transport.add('GET', 'transactions/btcusd/', b'''[
+            {"date": "1390424582", "tid": 2, "price": "814.91",
+             "amount": "1.65", "type": "0"},
+            {"date": "1390424581", "tid": 1, "price": "815.00",
+             "amount": "1.00", "type": "1"}]''')
+        self.transport.add('GET', 'order_book/btcusd/', b'''{
+            "timestamp": "1390424821",
+            "bids": [["817.22", "0.65"]], "asks": [["817.35", "0.04"]]}''')
+        self.client = bitstamp.client.Public(transport=self.transport)
+        self.out = io.BytesIO()
+
+    def lines(self):
+        return [json.loads(line.decode('utf-8'))
+                for line in self.out.getvalue().splitlines()]
+
+    def test_ticker(self):
+        streamer = Streamer(self.client, 'ticker', ['btcusd'], self.out,
+                            fields=['last'])
+        streamer.run(0, count=2)
+        self.assertEqual(self.lines(), [
+            {'pair': 'btcusd', 'last': '816.44', 'timestamp': '1390425002'},
+        ] * 2)
+
+    def test_trades_once(self):
+        streamer = Streamer(self.client, 'trades', ['btc/usd'], self.out)
+        streamer.run(0, count=2)
+        self.assertEqual([line['tid'] for line in self.lines()], [1, 2])
+        self.assertEqual(self.lines()[0]['price'], '815.00')
+
+    def test_book_deltas(self):
+        streamer = Streamer(self.client, 'book', ['btcusd'], self.out)
+        streamer.run(0, count=2)
+        self.assertEqual(len(self.lines()), 2)
+        self.assertEqual(self.lines()[1]['side'], 'asks')
+
+    def test_binary(self):
+        streamer = Streamer(self.client, 'ticker', ['btcusd'], self.out,
+                            binary=True)
+        streamer.poll()
+        data = self.out.getvalue()
+        kind, count, pair, _, timestamp = HEADER.unpack_from(data)
+        self.assertEqual((kind, count, pair.rstrip(b'\0')),
+                         (1, 4, b'btcusd'))
+        self.assertEqual(timestamp, 1390425002)
+        values = struct.unpack_from('<4d', data, HEADER.size)
+        self.assertEqual(values[0], 816.44)
+        self.assertEqual(len(data), HEADER.size + 32)
+
+    def test_errors_logged(self):
+        streamer = Streamer(self.client, 'ticker', ['ethusd', 'btcusd'],
+                            self.out)
+        streamer.poll()
+        self.assertEqual([line['pair'] for line in self.lines()], ['btcusd'])
+
+    def test_urllib3_errors_logged(self):
+        server = HTTPServer(('127.0.0.1', 0), DroppingHandler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        url = 'http://127.0.0.1:{}/'.format(server.server_address[1])
+        client = bitstamp.client.Public(transport='urllib3')
+        client.api_url = {1: url, 2: url}
+        try:
+            Streamer(client, 'ticker', ['btcusd'], self.out).run(0, count=2)
+        finally:
+            client.transport.close()
+            server.shutdown()
+            server.server_close()
+        self.assertEqual(self.out.getvalue(), b'')
+
+
+class ArgumentTests(unittest.TestCase):
+
+    def test_split_pair(self):
+        self.assertEqual(split_pair('btcusd'), ('btc', 'usd'))
+        self.assertEqual(split_pair('USDC-USD'), ('usdc', 'usd'))
+
+    def test_defaults(self):
+        args = parse_args(['trades'])
+        self.assertEqual(args.pairs, 'btcusd')
+        self.assertEqual(args.format, 'ndjson')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+import bitstamp.client
+import mock
+from bitstamp.clock import ClockEstimator, parse_http_date
+from bitstamp.transport import MemoryTransport
+
+
+class ClockEstimatorTests(unittest.TestCase):
+
+    def test_parse_http_date(self):
+        self.assertEqual(parse_http_date('Thu, 01 Jan 1970 00:01:40 GMT'), 100)
+        self.assertIsNone(parse_http_date('garbage'))
+        self.assertIsNone(parse_http_date(None))
+
+    def test_offset(self):
+        clock = ClockEstimator()
+        clock.observe('ticker/', 1000.0, 1001.0, server_time=1010)
+        self.assertEqual(clock.offset, 10)
+        clock.observe('ticker/', 1000.0, 1001.0, server_time=1018)
+        self.assertEqual(clock.offset, 11)
+
+    def test_lower_bound(self):
+        clock = ClockEstimator()
+        clock.observe_lower_bound(1005, 1000.0)
+        self.assertEqual(clock.offset, 5)
+        clock.observe_lower_bound(990, 1000.0)
+        self.assertEqual(clock.offset, 5)
+
+    def test_rtt(self):
+        clock = ClockEstimator()
+        self.assertIsNone(clock.rtt('ticker/'))
+        clock.observe('ticker/', 0.0, 0.8)
+        clock.observe('ticker/', 0.0, 1.6)
+        self.assertAlmostEqual(clock.rtt('ticker/'), 0.9)
+        self.assertIsNone(clock.rtt('balance/'))
+
+
+class ClientClockTests(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = MemoryTransport()
+        self.client = bitstamp.client.Trading(
+            'USERNAME', 'KEY', 'SECRET', transport=self.transport,
+            clock=ClockEstimator())
+
+    def test_date_header(self):
+        self.transport.add('GET', 'ticker/btcusd/', b'{}',
+                           headers={'Date': 'Thu, 01 Jan 1970 00:01:40 GMT'})
+        with mock.patch('time.time', return_value=50):
+            self.client.ticker()
+        self.assertEqual(self.client.clock.offset, 50.5)
+        self.assertEqual(self.client.clock.rtt('ticker/btcusd/'), 0)
+        with mock.patch('time.time', return_value=50):
+            self.assertEqual(self.client.server_time(), 100.5)
+            self.assertEqual(self.client.get_nonce(), 100)
+
+    def test_transactions_lower_bound(self):
+        self.transport.add(
+            'GET', 'transactions/btcusd/',
+            b'[{"date": "200", "tid": 2}, {"date": "150", "tid": 1}]')
+        with mock.patch('time.time', return_value=180):
+            self.client.transactions()
+        self.assertEqual(self.client.clock.offset, 20)
+
+
+    def test_nonce_not_below_local_time(self):
+        self.client.clock.offset = -30
+        with mock.patch('time.time', return_value=100):
+            self.assertEqual(self.client.get_nonce(), 100)
+
+    def test_nonce_shared_clock(self):
+        with mock.patch('bitstamp.client.DEFAULT_CLOCK', ClockEstimator()):
+            calibrated = bitstamp.client.Trading(
+                'USERNAME', 'KEY', 'SECRET', transport=self.transport)
+            self.transport.add(
+                'GET', 'ticker/btcusd/', b'{}',
+                headers={'Date': 'Thu, 01 Jan 1970 00:01:40 GMT'})
+            with mock.patch('time.time', return_value=50):
+                calibrated.ticker()
+                first = calibrated.get_nonce()
+                restarted = bitstamp.client.Trading(
+                    'USERNAME', 'KEY', 'SECRET', transport=self.transport)
+                self.assertIs(restarted.clock, calibrated.clock)
+                self.assertEqual(first, 100)
+                self.assertGreaterEqual(restarted.get_nonce(), first)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import threading
+import time
+import unittest
+
+import bitstamp.client
+import mock
+import requests
+from bitstamp.deadline import Deadline
+from bitstamp.transport import MemoryTransport
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+from .fake_response import FakeResponse
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.startswith('/trickle/'):
+            # Headers at once, then one byte of the body every 0.3s.
+            body = b'{"last": "1"}'
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            try:
+                for n in range(len(body)):
+                    self.wfile.write(body[n:n + 1])
+                    self.wfile.flush()
+                    time.sleep(0.3)
+            except (IOError, OSError):
+                pass
+            return
+        time.sleep(1)
+        try:
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b'{}')
+        except (IOError, OSError):
+            # The client gave up already.
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class DeadlineTests(unittest.TestCase):
+
+    def test_remaining(self):
+        deadline = Deadline(10)
+        self.assertGreater(deadline.remaining(), 9)
+        self.assertFalse(deadline.expired)
+        self.assertFalse(deadline.sleep(11))
+        self.assertEqual(Deadline(-1).remaining(), 0)
+        self.assertTrue(Deadline(-1).expired)
+
+    def test_wall_clock_jump(self):
+        deadline = Deadline(10)
+        with mock.patch('time.time', return_value=time.time() + 3600):
+            self.assertGreater(deadline.remaining(), 9)
+            self.assertFalse(deadline.expired)
+
+
+class ClientDeadlineTests(unittest.TestCase):
+
+    def test_default_timeout(self):
+        client = bitstamp.client.Public(timeout=3)
+        response = FakeResponse(b'{}')
+        with mock.patch('requests.get', return_value=response) as mocker:
+            client.ticker()
+        self.assertLessEqual(mocker.call_args[1]['timeout'], 3)
+        self.assertGreater(mocker.call_args[1]['timeout'], 2)
+
+    def test_timeout_bounds_whole_call(self):
+        def slow(*args):
+            time.sleep(0.3)
+            return b'{"bids": [], "asks": [["100", "1"]], "id": 1}'
+        transport = MemoryTransport()
+        transport.add('GET', 'order_book/btcusd/', slow)
+        transport.add('POST', 'buy/market/btcusd/', slow)
+        client = bitstamp.client.Trading('USERNAME', 'KEY', 'SECRET',
+                                         transport=transport, timeout=0.5)
+        self.assertRaises(bitstamp.client.BitstampTimeout,
+                          client.buy_market_order, '0.5', max_slippage=0.01)
+
+    def test_deadline_timeout(self):
+        client = bitstamp.client.Public(timeout=3)
+        response = FakeResponse(b'{}')
+        with mock.patch('requests.get', return_value=response) as mocker:
+            with client.deadline(1):
+                client.ticker()
+            with client.deadline(10):
+                client.ticker()
+        self.assertLessEqual(mocker.call_args_list[0][1]['timeout'], 1)
+        self.assertEqual(mocker.call_args_list[1][1]['timeout'], 3)
+
+    def test_nested_deadline(self):
+        client = bitstamp.client.Public()
+        with client.deadline(1) as outer:
+            with client.deadline(5) as inner:
+                self.assertIs(inner, outer)
+            with client.deadline(0.5) as inner:
+                self.assertLess(inner.expires, outer.expires)
+
+    def test_expired(self):
+        transport = MemoryTransport()
+        client = bitstamp.client.Public(transport=transport)
+        with client.deadline(-1):
+            self.assertRaises(bitstamp.client.BitstampTimeout, client.ticker)
+        self.assertEqual(transport.calls, [])
+
+
+class TransportTimeoutTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.daemon = True
+        cls.thread.start()
+        cls.url = 'http://127.0.0.1:{}/'.format(cls.server.server_address[1])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def check(self, transport, path=''):
+        client = bitstamp.client.Public(transport=transport)
+        client.api_url = {1: self.url + path, 2: self.url + path}
+        start = time.time()
+        with client.deadline(0.5):
+            self.assertRaises(bitstamp.client.BitstampTimeout, client.ticker)
+        self.assertLess(time.time() - start, 0.9)
+
+    def test_requests(self):
+        self.check('requests')
+
+    def test_urllib3(self):
+        self.check('urllib3')
+
+    def test_slow_body_requests(self):
+        self.check('requests', 'trickle/')
+
+    def test_slow_body_urllib3(self):
+        self.check('urllib3', 'trickle/')
+
+    def test_slow_body_client_timeout(self):
+        client = bitstamp.client.Public(timeout=0.5)
+        url = self.url + 'trickle/'
+        client.api_url = {1: url, 2: url}
+        start = time.time()
+        self.assertRaises(bitstamp.client.BitstampTimeout, client.ticker)
+        self.assertLess(time.time() - start, 0.9)
+
+    def test_transport_error(self):
+        transport = MemoryTransport()
+        transport.request = mock.Mock(side_effect=requests.ConnectionError)
+        client = bitstamp.client.Public(transport=transport)
+        with client.deadline(5):
+            self.assertRaises(requests.ConnectionError, client.ticker)
+
+
+if __name__ == '__main__':
+    unittest.main()
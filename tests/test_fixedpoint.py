@@ -0,0 +1,104 @@
+import unittest
+
+import bitstamp.client
+from bitstamp.fixedpoint import FixedPoint, from_scaled, to_scaled
+from bitstamp.transport import MemoryTransport
+
+PAIRS_INFO = b'''[{"url_symbol": "btcusd", "name": "BTC/USD",
+    "base_decimals": 8, "counter_decimals": 2}]'''
+
+
+class ScalingTests(unittest.TestCase):
+
+    def test_to_scaled(self):
+        self.assertEqual(to_scaled('816.44', 2), 81644)
+        self.assertEqual(to_scaled('816.4', 2), 81640)
+        self.assertEqual(to_scaled('816', 2), 81600)
+        self.assertEqual(to_scaled('.5', 2), 50)
+        self.assertEqual(to_scaled('-39.25', 2), -3925)
+        self.assertEqual(to_scaled('0.00000001', 8), 1)
+        self.assertEqual(to_scaled('1.005', 2), 101)
+        self.assertEqual(to_scaled('1.004', 2), 100)
+        self.assertEqual(to_scaled('1e-05', 8), 1000)
+        self.assertEqual(to_scaled(3, 2), 300)
+
+    def test_from_scaled(self):
+        self.assertEqual(from_scaled(81644, 2), '816.44')
+        self.assertEqual(from_scaled(1, 8), '0.00000001')
+        self.assertEqual(from_scaled(-3925, 2), '-39.25')
+        self.assertEqual(from_scaled(5, 0), '5')
+
+    def test_unknown_pair(self):
+        converter = FixedPoint([])
+        self.assertRaises(ValueError, converter.price, 'btcusd', '1')
+
+
+class ClientFixedPointTests(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = MemoryTransport()
+        self.transport.add('GET', 'trading-pairs-info/', PAIRS_INFO)
+        self.client = bitstamp.client.Trading(
+            'USERNAME', 'KEY', 'SECRET', transport=self.transport,
+            fixed_point=True)
+
+    def test_ticker(self):
+        self.transport.add('GET', 'ticker/btcusd/', b'''{"last": "816.44",
+            "bid": "815.09", "volume": "8700.01208078",
+            "timestamp": "1390425002"}''')
+        ticker = self.client.ticker()
+        self.assertEqual(ticker['last'], 81644)
+        self.assertEqual(ticker['volume'], 870001208078)
+        self.assertEqual(ticker['timestamp'], '1390425002')
+        self.client.ticker()
+        pairs_info_calls = [call for call in self.transport.calls
+                            if call['url'].endswith('trading-pairs-info/')]
+        self.assertEqual(len(pairs_info_calls), 1)
+
+    def test_order_book_and_transactions(self):
+        self.transport.add('GET', 'order_book/btcusd/', b'''{
+            "bids": [["817.22", "0.65814591"]], "asks": []}''')
+        self.transport.add('GET', 'transactions/btcusd/', b'''[
+            {"tid": 1, "price": "814.91", "amount": "1.65000000"}]''')
+        book = self.client.order_book()
+        self.assertEqual(book['bids'], [[81722, 65814591]])
+        trade, = self.client.transactions()
+        self.assertEqual((trade['price'], trade['amount']),
+                         (81491, 165000000))
+
+    def test_order_book_order_ids(self):
+        self.transport.add('GET', 'order_book/btcusd/', b'''{
+            "bids": [["817.22", "0.65814591", "1379563051"]], "asks": []}''')
+        book = self.client.order_book(group=2)
+        self.assertEqual(book['bids'], [[81722, 65814591, '1379563051']])
+
+    def test_orders(self):
+        self.transport.add('POST', 'buy/btcusd/', b'{"id": 1}')
+        self.client.buy_limit_order(10000000, 81644, limit_price=82000)
+        data = self.transport.calls[-1]['data']
+        self.assertEqual(data['amount'], '0.10000000')
+        self.assertEqual(data['price'], '816.44')
+        self.assertEqual(data['limit_price'], '820.00')
+        self.transport.add('POST', 'sell/market/btcusd/', b'{"id": 2}')
+        self.client.sell_market_order('0.5')
+        self.assertEqual(self.transport.calls[-1]['data']['amount'], '0.5')
+
+    def test_max_slippage(self):
+        self.transport.add('GET', 'order_book/btcusd/', b'''{
+            "bids": [], "asks": [["100.00", "0.1"], ["200.00", "10.0"]]}''')
+        self.transport.add('POST', 'buy/market/btcusd/', b'{"id": 1}')
+        for amount in ('5', 500000000):
+            self.assertRaises(bitstamp.client.SlippageError,
+                              self.client.buy_market_order, amount,
+                              max_slippage=0.01)
+        self.client.buy_market_order('0.05', max_slippage=0.01)
+        self.assertEqual(self.transport.calls[-1]['data']['amount'], '0.05')
+
+    def test_disabled(self):
+        client = bitstamp.client.Public(transport=self.transport)
+        self.transport.add('GET', 'ticker/btcusd/', b'{"last": "816.44"}')
+        self.assertEqual(client.ticker(), {'last': '816.44'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import datetime
+import json
+import unittest
+
+import bitstamp.client
+import mock
+from bitstamp.history import HistoryStore, HistorySync
+from bitstamp.transport import MemoryTransport
+
+
+def transaction(n, pair=True):
+    result = {'id': n, 'type': 2 if pair else 0, 'fee': '0.20',
+              'datetime': '2020-01-{:02d} 12:00:00'.format(n),
+              'usd': '-10.00', 'btc': '0.001'}
+    if pair:
+        result['btc_usd'] = '10000.00'
+        result['order_id'] = 1000 + n
+    return result
+
+
+class HistoryTests(unittest.TestCase):
+
+    def setUp(self):
+        self.history = [transaction(n, pair=n % 3 != 0) for n in range(1, 8)]
+        self.withdrawals = []
+        self.transport = MemoryTransport()
+        self.transport.add('POST', 'v2/user_transactions/',
+                           self.user_transactions)
+        self.transport.add(
+            'POST', 'withdrawal_requests/',
+            lambda *args: json.dumps(self.withdrawals).encode('utf-8'))
+        self.client = bitstamp.client.Trading(
+            'USERNAME', 'KEY', 'SECRET', transport=self.transport)
+        self.store = HistoryStore()
+        self.sync = HistorySync(self.client, self.store, page_size=3)
+
+    def tearDown(self):
+        self.store.close()
+
+    def user_transactions(self, method, url, params, data):
+        self.assertEqual(data['sort'], 'asc')
+        since_id = data.get('since_id', 0)
+        result = [t for t in self.history if t['id'] >= since_id]
+        return json.dumps(result[:data['limit']]).encode('utf-8')
+
+    def requests_made(self):
+        return [call['data'].get('since_id') for call in self.transport.calls
+                if call['url'].endswith('user_transactions/')]
+
+    def test_initial_sync(self):
+        self.assertEqual(self.sync.sync_transactions(), 7)
+        self.assertEqual(self.store.last_transaction_id(), 7)
+        self.assertEqual(self.requests_made(), [None, 3, 5, 7])
+
+    def test_incremental_sync(self):
+        self.sync.sync_transactions()
+        self.transport.calls = []
+        self.history.append(transaction(8))
+        self.assertEqual(self.sync.sync_transactions(), 1)
+        self.assertEqual(self.requests_made(), [7])
+        self.assertEqual(self.sync.sync_transactions(), 0)
+
+    def test_queries(self):
+        self.sync.sync_transactions()
+        trades = self.store.transactions(pair='BTC/USD')
+        self.assertEqual([t['id'] for t in trades], [1, 2, 4, 5, 7])
+        self.assertEqual(trades[0]['btc_usd'], '10000.00')
+        result = self.store.transactions(
+            start=datetime.datetime(2020, 1, 2, 12),
+            end='2020-01-05 00:00:00')
+        self.assertEqual([t['id'] for t in result], [2, 3, 4])
+        self.assertEqual(len(self.store.transactions(limit=2)), 2)
+
+    def test_withdrawals(self):
+        self.withdrawals = [{'id': 1, 'datetime': '2020-01-01 00:00:00',
+                             'status': 0, 'amount': '1'}]
+        with mock.patch('time.time', return_value=1000):
+            self.sync.sync_withdrawals()
+        self.withdrawals[0]['status'] = 2
+        with mock.patch('time.time', return_value=1600):
+            self.sync.sync_withdrawals()
+        deltas = [call['data']['timedelta'] for call in self.transport.calls]
+        self.assertEqual(deltas, [HistorySync.max_timedelta, 600 + 86400])
+        stored, = self.store.withdrawals()
+        self.assertEqual(stored['status'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
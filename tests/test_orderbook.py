@@ -0,0 +1,55 @@
+import unittest
+
+from bitstamp.orderbook import (ADD, CHANGE, REMOVE, OrderBookDiffer,
+                                apply_deltas, diff_order_book)
+
+OLD = {'timestamp': '100',
+       'bids': [['101.00', '1.0'], ['100.00', '2.0'], ['99.00', '3.0']],
+       'asks': [['102.00', '1.0'], ['103.00', '2.0']]}
+NEW = {'timestamp': '101',
+       'bids': [['101.50', '0.5'], ['101.00', '1.0'], ['99.00', '1.0']],
+       'asks': [['102.00', '1.0'], ['103.00', '2.5'], ['104.00', '4.0']]}
+
+
+class OrderBookDiffTests(unittest.TestCase):
+
+    def test_diff(self):
+        self.assertEqual(diff_order_book(OLD, NEW), [
+            ('bids', ADD, '101.50', '0.5'),
+            ('bids', REMOVE, '100.00', '0'),
+            ('bids', CHANGE, '99.00', '1.0'),
+            ('asks', CHANGE, '103.00', '2.5'),
+            ('asks', ADD, '104.00', '4.0'),
+        ])
+
+    def test_no_change(self):
+        self.assertEqual(diff_order_book(OLD, OLD), [])
+
+    def test_same_price_formatting(self):
+        other = dict(OLD, asks=[['102.0', '1.00'], ['103.00', '2.0']])
+        self.assertEqual(diff_order_book(OLD, other), [])
+
+    def test_apply(self):
+        result = apply_deltas(OLD, diff_order_book(OLD, NEW))
+        self.assertEqual(result['bids'], NEW['bids'])
+        self.assertEqual(result['asks'], NEW['asks'])
+
+    def test_apply_same_price_formatting(self):
+        book = {'bids': [], 'asks': [['102.00', '1.0']]}
+        result = apply_deltas(book, [('asks', CHANGE, '102.0', '2.0')])
+        self.assertEqual(result['asks'], [['102.0', '2.0']])
+        result = apply_deltas(book, [('asks', REMOVE, '102.0', '0')])
+        self.assertEqual(result['asks'], [])
+
+    def test_differ(self):
+        differ = OrderBookDiffer()
+        deltas = differ.update(OLD)
+        self.assertEqual(len(deltas), 5)
+        self.assertTrue(all(d[1] == ADD for d in deltas))
+        self.assertEqual(len(differ.update(NEW)), 5)
+        self.assertEqual(differ.update(OLD), [])
+        self.assertIs(differ.book, NEW)
+
+
+if __name__ == '__main__':
+    unittest.main()
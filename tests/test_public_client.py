@@ -38,6 +38,15 @@ class PublicTests(unittest.TestCase):
             ticker = self.client.ticker()
         self.assertIsInstance(ticker, dict)
 
+    def test_all_tickers(self):
+        response = FakeResponse(b'''
+            [{"pair": "BTC/USD", "last": "816.44", "bid": "815.09",
+              "ask": "816.44"}]''')
+        with mock.patch('requests.get', return_value=response) as mocker:
+            tickers = self.client.all_tickers()
+        self.assertIsInstance(tickers, list)
+        self.assertTrue(mocker.call_args[0][0].endswith('/v2/ticker/'))
+
     def test_ticker_hour(self):
         response = FakeResponse(b'''
             {"volume": "8700.01208078", "last": "816.44",
@@ -110,6 +119,28 @@ class BackwardsCompatPublicTests(unittest.TestCase):
         with mock.patch('requests.get', return_value=response):
             self.assertRaises(requests.HTTPError, self.client.ticker)
 
+    def test_wrapper_cached(self):
+        self.assertIs(self.client.ticker, self.client.ticker)
+        self.assertIn('ticker', vars(self.client))
+
+    def test_setattr_forwarded(self):
+        self.client.proxydict = {'https': 'http://proxy:3128'}
+        self.assertEqual(self.client.wrapped.proxydict,
+                         {'https': 'http://proxy:3128'})
+        self.assertNotIn('proxydict', vars(self.client))
+
+    def test_replace_wrapped(self):
+        self.client.ticker
+        self.client.wrapped = mock.Mock()
+        self.client.wrapped.ticker.return_value = {'last': '1'}
+        self.assertEqual(self.client.ticker(), {'last': '1'})
+
+    def test_setattr_replaces_cached_wrapper(self):
+        self.client.ticker
+        self.client.ticker = mock.Mock(
+            side_effect=bitstamp.client.BitstampError('replaced'))
+        self.assertEqual(self.client.ticker(), (False, 'replaced'))
+
 
 if __name__ == '__main__':
     unittest.main()
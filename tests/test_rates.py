@@ -0,0 +1,67 @@
+import unittest
+
+import bitstamp.client
+from bitstamp.rates import RateMatrix
+from bitstamp.transport import MemoryTransport
+
+
+class RateMatrixTests(unittest.TestCase):
+
+    def setUp(self):
+        self.matrix = RateMatrix()
+        self.matrix.update('BTC/USD', {'bid': '100', 'ask': '100'})
+        self.matrix.update('BTC/EUR', {'bid': '80', 'ask': '80'})
+        self.matrix.update('EUR/USD', {'bid': '1.25', 'ask': '1.25'})
+
+    def test_direct(self):
+        self.assertEqual(self.matrix.rates[0][1], 100.0)
+        self.assertEqual(self.matrix.rates[1][0], 0.01)
+        self.assertEqual(self.matrix.currencies, ['BTC', 'USD', 'EUR'])
+
+    def test_convert(self):
+        rate, path = self.matrix.convert('BTC', 'USD')
+        self.assertEqual(rate, 100.0)
+        self.assertEqual(path, ['BTC', 'USD'])
+
+    def test_indirect(self):
+        self.matrix.update('EUR/USD', {'bid': '1.30', 'ask': '1.30'})
+        rate, path = self.matrix.convert('BTC', 'USD')
+        self.assertAlmostEqual(rate, 104.0)
+        self.assertEqual(path, ['BTC', 'EUR', 'USD'])
+
+    def test_no_cycles(self):
+        self.assertEqual(self.matrix.cycles(min_gain=1.0001), [])
+
+    def test_cycle(self):
+        self.matrix.update('EUR/USD', {'bid': '1.30', 'ask': '1.31'})
+        cycles = self.matrix.cycles()
+        self.assertTrue(cycles)
+        gain, path = cycles[0]
+        self.assertAlmostEqual(gain, 1.04)
+        self.assertEqual(path[0], path[-1])
+
+    def test_fee(self):
+        matrix = RateMatrix(fee=0.01)
+        matrix.update('BTC/USD', {'bid': '100', 'ask': '100'})
+        self.assertAlmostEqual(matrix.convert('BTC', 'USD')[0], 99.0)
+        self.assertAlmostEqual(matrix.best()[0][0][0], 0.9801)
+
+    def test_unreachable(self):
+        self.matrix.update('XRP/GBP', {'bid': '1', 'ask': '1'})
+        self.assertEqual(self.matrix.convert('BTC', 'XRP'), (0.0, []))
+
+    def test_refresh(self):
+        transport = MemoryTransport()
+        transport.add('GET', 'v2/ticker/', b'''[
+            {"pair": "BTC/USD", "bid": "100", "ask": "101"},
+            {"pair": "ETH/BTC", "bid": "0.05", "ask": "0.06"}]''')
+        matrix = RateMatrix(bitstamp.client.Public(transport=transport))
+        matrix.refresh()
+        self.assertEqual(len(transport.calls), 1)
+        rate, path = matrix.convert('ETH', 'USD')
+        self.assertAlmostEqual(rate, 5.0)
+        self.assertEqual(path, ['ETH', 'BTC', 'USD'])
+
+
+if __name__ == '__main__':
+    unittest.main()
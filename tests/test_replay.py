@@ -0,0 +1,81 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import bitstamp.client
+import requests
+from bitstamp.clock import ClockEstimator
+from bitstamp.replay import RecordingTransport, ReplayTransport
+from bitstamp.transport import MemoryTransport
+
+
+class RecordReplayTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'session.ndjson')
+        self.live = MemoryTransport()
+        self.live.add('GET', 'ticker/btcusd/', b'{"last": "816.44"}',
+                      headers={'Date': 'Thu, 01 Jan 1970 00:01:40 GMT'})
+        self.live.add('GET', 'order_book/btcusd/',
+                      lambda method, url, params, data: json.dumps(
+                          {'group': params['group']}).encode('utf-8'))
+        self.live.add('POST', 'balance/btcusd/', b'{"fee": "0.5"}')
+        self.live.add('GET', 'transactions/btcusd/', b'\xff',
+                      status_code=200)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def record(self):
+        recorder = RecordingTransport(self.path, transport=self.live)
+        client = bitstamp.client.Trading('USERNAME', 'KEY', 'SECRET',
+                                         transport=recorder)
+        client.ticker()
+        client.order_book(group=1)
+        client.order_book(group=2)
+        client.account_balance()
+        client._get('transactions/btcusd/', version=2)
+        recorder.close()
+
+    def test_record(self):
+        self.record()
+        with open(self.path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 5)
+        self.assertEqual(records[3]['data'], [])
+        self.assertIn('content_base64', records[4])
+
+    def test_replay(self):
+        self.record()
+        replay = ReplayTransport(self.path)
+        self.assertEqual(replay.count, 5)
+        client = bitstamp.client.Trading('USERNAME', 'KEY', 'SECRET',
+                                         transport=replay,
+                                         clock=ClockEstimator())
+        for _ in range(3):
+            self.assertEqual(client.ticker(), {'last': '816.44'})
+            self.assertEqual(client.account_balance(), {'fee': '0.5'})
+        self.assertEqual(client.order_book(group=2), {'group': 2})
+        self.assertEqual(client.order_book(group=1), {'group': 1})
+        self.assertEqual(
+            client._get('transactions/btcusd/', version=2).content, b'\xff')
+        self.assertEqual(client.clock.samples, 3)
+
+    def test_fallback_and_unmatched(self):
+        self.record()
+        client = bitstamp.client.Public(transport=ReplayTransport(self.path))
+        self.assertIn('group', client.order_book(group=3))
+        self.assertRaises(requests.HTTPError, client.ticker_hour)
+
+    def test_speed(self):
+        self.record()
+        replay = ReplayTransport(self.path, speed=1000.0)
+        client = bitstamp.client.Public(transport=replay)
+        self.assertEqual(client.ticker(), {'last': '816.44'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+
+import bitstamp.client
+import mock
+import requests
+from bitstamp.tracing import RequestTrace
+from bitstamp.transport import MemoryTransport
+
+
+class RequestTraceTests(unittest.TestCase):
+
+    def test_phase(self):
+        trace = RequestTrace('GET', 'ticker/')
+        with trace.phase('decode'):
+            pass
+        self.assertIn('decode', trace.phases)
+        self.assertIsNone(trace.duration)
+        trace.finish()
+        self.assertGreaterEqual(trace.duration, 0)
+
+    def test_as_dict(self):
+        trace = RequestTrace('GET', 'ticker/')
+        trace.add('wait', 0.5)
+        trace.add('wait', 0.25)
+        trace.finish()
+        self.assertEqual(trace.as_dict()['phases'], {'wait': 0.75})
+
+
+class ClientTracingTests(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = MemoryTransport()
+        self.client = bitstamp.client.Trading(
+            'USERNAME', 'KEY', 'SECRET', transport=self.transport)
+        self.traces = []
+        self.client.add_trace_hook(self.traces.append)
+
+    def test_post(self):
+        self.transport.add('POST', 'buy/btcusd/', b'{"id": 1}')
+        self.client.buy_limit_order('0.1', '90')
+        trace, = self.traces
+        self.assertEqual(trace.method, 'POST')
+        self.assertEqual(trace.endpoint, 'buy/btcusd/')
+        self.assertEqual(trace.status_code, 200)
+        self.assertEqual(trace.nonce, self.transport.calls[0]['data']['nonce'])
+        self.assertEqual(list(trace.phases),
+                         ['sign', 'wait', 'download', 'decode'])
+        self.assertIsNotNone(trace.duration)
+
+    def test_get(self):
+        self.transport.add('GET', 'ticker/btcusd/', b'{}')
+        self.client.ticker()
+        trace, = self.traces
+        self.assertEqual(list(trace.phases), ['wait', 'download', 'decode'])
+        self.assertIsNone(trace.nonce)
+
+    def test_error(self):
+        self.transport.add('GET', 'ticker/btcusd/', b'{"error": "bad"}')
+        self.assertRaises(bitstamp.client.BitstampError, self.client.ticker)
+        self.assertIsInstance(self.traces[0].error,
+                              bitstamp.client.BitstampError)
+        self.assertRaises(requests.HTTPError, self.client.ticker_hour)
+        self.assertEqual(self.traces[1].status_code, 404)
+
+    def test_failing_transport(self):
+        self.transport.request = mock.Mock(side_effect=requests.Timeout)
+        self.transport.timeout_exceptions = (requests.Timeout,)
+        self.assertRaises(bitstamp.client.BitstampTimeout,
+                          self.client.buy_limit_order, '0.1', '90')
+        trace, = self.traces
+        self.assertTrue(trace.url.endswith('buy/btcusd/'))
+        self.assertIsNotNone(trace.nonce)
+        self.assertEqual(list(trace.phases), ['sign', 'wait'])
+        self.assertIsInstance(trace.error, bitstamp.client.BitstampTimeout)
+
+    def test_failing_hook(self):
+        def hook(trace):
+            raise RuntimeError('hook failed')
+        self.client.add_trace_hook(hook)
+        self.transport.add('POST', 'buy/btcusd/', b'{"id": 1}')
+        with mock.patch('bitstamp.client.logger') as logger:
+            result = self.client.buy_limit_order('0.1', '90')
+        self.assertEqual(result, {'id': 1})
+        self.assertTrue(logger.exception.called)
+        self.assertEqual(len(self.traces), 1)
+
+    def test_remove_hook(self):
+        self.transport.add('GET', 'ticker/btcusd/', b'{}')
+        self.client.remove_trace_hook(self.traces.append)
+        self.client.ticker()
+        self.assertEqual(self.traces, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
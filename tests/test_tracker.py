@@ -0,0 +1,123 @@
+import json
+import unittest
+
+import bitstamp.client
+from bitstamp.tracker import OrderEvent, OrderTracker
+from bitstamp.transport import MemoryTransport
+import mock
+import requests
+
+
+def order(order_id, amount):
+    return {'id': str(order_id), 'amount': amount, 'price': '100.00',
+            'type': '0', 'currency_pair': 'BTC/USD'}
+
+
+class OrderTrackerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.open_orders = []
+        self.statuses = {}
+        self.transport = MemoryTransport()
+        self.transport.add(
+            'POST', 'open_orders/all/',
+            lambda *args: json.dumps(self.open_orders).encode('utf-8'))
+        self.transport.add(
+            'POST', 'order_status/',
+            lambda method, url, params, data: json.dumps(
+                self.statuses[str(data['id'])]).encode('utf-8'))
+        self.client = bitstamp.client.Trading(
+            'USERNAME', 'KEY', 'SECRET', transport=self.transport)
+        self.tracker = OrderTracker(self.client, min_interval=1,
+                                    max_interval=8)
+        self.events = []
+        self.tracker.add_listener(self.events.append)
+
+    def status_calls(self):
+        return [call for call in self.transport.calls
+                if call['url'].endswith('order_status/')]
+
+    def test_no_change(self):
+        self.open_orders = [order(1, '1.0'), order(2, '2.0')]
+        self.tracker.watch(1)
+        self.tracker.watch(2)
+        self.assertEqual(self.tracker.poll(), [])
+        self.assertEqual(self.status_calls(), [])
+        self.assertEqual(self.tracker.interval, 2)
+
+    def test_partial_fill(self):
+        self.open_orders = [order(1, '1.0')]
+        self.tracker.watch(1, order(1, '1.0'))
+        self.open_orders = [order(1, '0.4')]
+        events = self.tracker.poll()
+        self.assertEqual([e.kind for e in events], [OrderEvent.PARTIAL_FILL])
+        self.assertEqual(events[0].order['amount'], '0.4')
+        self.assertEqual(self.status_calls(), [])
+
+    def test_fill_and_cancel(self):
+        self.tracker.watch(1)
+        self.tracker.watch(2)
+        self.tracker.watch(3)
+        self.open_orders = [order(3, '1.0')]
+        self.statuses = {
+            '1': {'status': 'Finished', 'transactions': [{'tid': 9}]},
+            '2': {'status': 'Finished', 'transactions': []},
+        }
+        events = dict((e.order_id, e.kind) for e in self.tracker.poll())
+        self.assertEqual(events, {'1': OrderEvent.FILL,
+                                  '2': OrderEvent.CANCEL})
+        self.assertEqual(len(self.status_calls()), 2)
+        self.assertEqual(list(self.tracker.orders), ['3'])
+        self.assertEqual(len(self.events), 2)
+
+    def test_expired(self):
+        self.tracker.watch(1)
+        self.statuses = {'1': {'status': 'Expired', 'transactions': []}}
+        events = self.tracker.poll()
+        self.assertEqual([e.kind for e in events], [OrderEvent.EXPIRE])
+        self.assertEqual(self.tracker.orders, {})
+
+    def test_status_error(self):
+        def order_status(method, url, params, data):
+            if data['id'] == '2':
+                raise requests.ConnectionError('connection reset')
+            return json.dumps(self.statuses[data['id']]).encode('utf-8')
+        self.transport.add('POST', 'order_status/', order_status)
+        self.tracker.watch(1)
+        self.tracker.watch(2)
+        self.statuses = {'1': {'status': 'Finished', 'transactions': []}}
+        events = self.tracker.poll()
+        self.assertEqual([(e.order_id, e.kind) for e in self.events],
+                         [('1', OrderEvent.CANCEL)])
+        self.assertEqual(events, self.events)
+        self.assertEqual(list(self.tracker.orders), ['2'])
+
+    def test_run_survives_errors(self):
+        self.tracker.watch(1)
+        self.statuses = {'1': {'status': 'Canceled', 'transactions': []}}
+        self.transport.add('POST', 'open_orders/all/', status_code=500)
+        stop_event = mock.Mock()
+        stop_event.is_set.side_effect = [False, False, True]
+        self.tracker.run(stop_event)
+        self.assertEqual(self.tracker.interval, 4)
+        self.assertIn('1', self.tracker.orders)
+
+    def test_still_open(self):
+        self.tracker.watch(1)
+        self.statuses = {'1': {'status': 'In Queue', 'transactions': []}}
+        self.assertEqual(self.tracker.poll(), [])
+        self.assertIn('1', self.tracker.orders)
+
+    def test_adaptive_interval(self):
+        self.open_orders = [order(1, '1.0')]
+        self.tracker.watch(1)
+        for expected in (2, 4, 8, 8):
+            self.tracker.poll()
+            self.assertEqual(self.tracker.interval, expected)
+        self.open_orders = [order(1, '0.5')]
+        self.tracker.poll()
+        self.assertEqual(self.tracker.interval, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,12 @@
 import unittest
+import warnings
 
 import bitstamp.client
 import mock
 import requests
 import hmac
 import hashlib
+from bitstamp.clock import ClockEstimator
 
 from .fake_response import FakeResponse
 
@@ -36,6 +38,7 @@ class TradingTests(unittest.TestCase):
             self.assertRaises(requests.HTTPError, self.client.account_balance)
 
     def test_nonce(self):
+        self.client.clock = ClockEstimator()
         # Each call to .nonce increases it.
         with mock.patch('time.time', return_value=1):
             self.assertEqual(self.client.get_nonce(), 1)
@@ -238,5 +241,29 @@ class TradingTests(unittest.TestCase):
         self.assertEqual(result["status"], "ok")
 
 
+class BackwardsCompatTradingTests(unittest.TestCase):
+
+    def setUp(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            self.client = bitstamp.client.trading('USERNAME', 'KEY', 'SECRET')
+
+    def test_bad_response(self):
+        response = FakeResponse(b'''{"error": "something went wrong"}''')
+        with mock.patch('requests.post', return_value=response):
+            self.assertEqual(self.client.account_balance(),
+                             (False, 'something went wrong'))
+            # The cached wrapper still converts errors.
+            self.assertEqual(self.client.account_balance(),
+                             (False, 'something went wrong'))
+
+    def test_deadline(self):
+        response = FakeResponse(b'{"fee": "0.5000"}')
+        with mock.patch('requests.post', return_value=response):
+            with self.client.deadline(10):
+                result = self.client.account_balance()
+        self.assertEqual(result, {'fee': '0.5000'})
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,158 @@
+import json
+import threading
+import unittest
+
+import bitstamp.client
+import bitstamp.transport
+import mock
+import requests
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+from .fake_response import FakeResponse
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+
+    def _reply(self, body):
+        content = json.dumps({'path': self.path, 'body': body}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        if self.path.startswith('/drop/'):
+            # Close the connection without answering.
+            return
+        self._reply(None)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self._reply(self.rfile.read(length).decode('utf-8'))
+
+    def log_message(self, *args):
+        pass
+
+
+class MemoryTransportTests(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = bitstamp.transport.MemoryTransport()
+        self.client = bitstamp.client.Trading(
+            'USERNAME', 'KEY', 'SECRET', transport=self.transport)
+
+    def test_get(self):
+        self.transport.add('GET', 'ticker/btcusd/', b'{"last": "816.44"}')
+        self.assertEqual(self.client.ticker(), {'last': '816.44'})
+        call = self.transport.calls[0]
+        self.assertEqual(call['url'],
+                         'https://www.bitstamp.net/api/v2/ticker/btcusd/')
+
+    def test_post(self):
+        self.transport.add('POST', 'balance/btcusd/', b'{"fee": "0.5"}')
+        self.assertEqual(self.client.account_balance(), {'fee': '0.5'})
+        self.assertIn('signature', self.transport.calls[0]['data'])
+
+    def test_callable_content(self):
+        self.transport.add(
+            'POST', 'order_status/',
+            lambda method, url, params, data: json.dumps(
+                {'id': data['id']}).encode('utf-8'))
+        self.assertEqual(self.client.order_status(7), {'id': 7})
+
+    def test_unmatched(self):
+        self.assertRaises(requests.HTTPError, self.client.ticker)
+
+    def test_error_status(self):
+        self.transport.add('GET', 'ticker/btcusd/', status_code=500)
+        self.assertRaises(requests.HTTPError, self.client.ticker)
+
+
+class TransportSelectionTests(unittest.TestCase):
+
+    def test_default(self):
+        client = bitstamp.client.Public()
+        self.assertIsInstance(client.transport,
+                              bitstamp.transport.RequestsTransport)
+
+    def test_by_name(self):
+        client = bitstamp.client.Public(transport='memory')
+        self.assertIsInstance(client.transport,
+                              bitstamp.transport.MemoryTransport)
+
+    def test_unknown(self):
+        self.assertRaises(ValueError, bitstamp.client.Public,
+                          transport='carrier-pigeon')
+
+    def test_proxies_passed(self):
+        response = FakeResponse(b'{}')
+        client = bitstamp.client.Public(proxydict={'https': 'http://proxy'})
+        with mock.patch('requests.get', return_value=response) as mocker:
+            client.ticker()
+        self.assertEqual(mocker.call_args[1]['proxies'],
+                         {'https': 'http://proxy'})
+
+    def test_requests_session(self):
+        session = mock.Mock()
+        session.request.return_value = FakeResponse(b'{}')
+        transport = bitstamp.transport.RequestsTransport(session=session)
+        client = bitstamp.client.Public(transport=transport)
+        self.assertEqual(client.ticker(), {})
+        self.assertEqual(session.request.call_args[0][0], 'GET')
+
+
+class Urllib3TransportTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), EchoHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.daemon = True
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        url = 'http://127.0.0.1:{}/'.format(self.server.server_address[1])
+        self.client = bitstamp.client.Public(transport='urllib3')
+        self.client.api_url = {1: url, 2: url}
+
+    def tearDown(self):
+        self.client.transport.close()
+
+    def test_get_params(self):
+        result = self.client.ohlc(step=300)
+        self.assertTrue(result['path'].startswith('/ohlc/btcusd/?'))
+        self.assertIn('step=300', result['path'])
+        self.assertNotIn('start', result['path'])
+
+    def test_post_data(self):
+        result = self.client._post('echo/', data={'amount': 1},
+                                   return_json=True)
+        self.assertEqual(result['body'], 'amount=1')
+
+    def test_connection_error(self):
+        self.assertRaises(requests.ConnectionError, self.client._get,
+                          'drop/')
+
+    def test_connection_refused(self):
+        closed = HTTPServer(('127.0.0.1', 0), EchoHandler)
+        url = 'http://127.0.0.1:{}/'.format(closed.server_address[1])
+        closed.server_close()
+        self.client.api_url = {1: url, 2: url}
+        self.client.timeout = 5
+        # Not a BitstampTimeout, although urllib3 raises a subclass of
+        # ConnectTimeoutError.
+        self.assertRaises(requests.ConnectionError, self.client.ticker)
+
+
+if __name__ == '__main__':
+    unittest.main()